@@ -4,6 +4,7 @@
 """
 import re
 import logging
+from functools import lru_cache
 from typing import Union, List
 logger = logging.getLogger(__name__)
 
@@ -19,6 +20,8 @@ class NumberToWordsConverter:
         self.two_forms = ['два', 'две', 'два']
         self.three_forms = ['три', 'три', 'три']
         self.four_forms = ['четыре', 'четыре', 'четыре']
+        # Кэш на экземпляр, а не lru_cache на методе: тот держал бы self в глобальном кэше
+        self._convert_int = lru_cache(maxsize=8192)(self._convert_int_uncached)
 
     def _get_plural_form(self, number: int, forms: tuple) -> str:
         """Получает правильную форму множественного числа"""
@@ -80,37 +83,41 @@ class NumberToWordsConverter:
         try:
             if isinstance(number, str):
                 number = int(number.replace(' ', '').replace(',', ''))
-            if number == 0:
-                return 'ноль'
-            if number < 0:
-                return 'минус ' + self.convert_number(-number, gender)
-            groups = []
-            temp = number
-            while temp > 0:
-                groups.append(temp % 1000)
-                temp //= 1000
-            result = []
-            for (i, group) in enumerate(groups):
-                if group == 0:
-                    continue
-                current_gender = gender
-                if i == 1:
-                    current_gender = 'f'
-                elif i >= 2:
-                    current_gender = 'm'
-                group_words = self._convert_triplet(group, current_gender)
-                if group_words:
-                    result.append(group_words)
-                    if i < len(self.orders):
-                        order_forms = self.orders[i]
-                        order_word = self._get_plural_form(group, order_forms)
-                        if order_word:
-                            result.append(order_word)
-            return ' '.join(reversed(result))
+            return self._convert_int(number, gender)
         except (ValueError, TypeError) as e:
             logger.exception('Ошибка конвертации числа {number}')
             return str(number)
 
+    def _convert_int_uncached(self, number: int, gender: str) -> str:
+        """Число словами; результат кэшируется - одни и те же числа (часы, минуты, даты, суммы) повторяются из запроса в запрос"""
+        if number == 0:
+            return 'ноль'
+        if number < 0:
+            return 'минус ' + self._convert_int(-number, gender)
+        groups = []
+        temp = number
+        while temp > 0:
+            groups.append(temp % 1000)
+            temp //= 1000
+        result = []
+        for (i, group) in enumerate(groups):
+            if group == 0:
+                continue
+            current_gender = gender
+            if i == 1:
+                current_gender = 'f'
+            elif i >= 2:
+                current_gender = 'm'
+            group_words = self._convert_triplet(group, current_gender)
+            if group_words:
+                result.append(group_words)
+                if i < len(self.orders):
+                    order_forms = self.orders[i]
+                    order_word = self._get_plural_form(group, order_forms)
+                    if order_word:
+                        result.append(order_word)
+        return ' '.join(reversed(result))
+
     def convert_time(self, time_str: str) -> str:
         """
         Конвертирует время в слова
@@ -305,6 +312,20 @@ class NumberToWordsConverter:
             logger.exception('Ошибка конвертации денежной суммы {amount_str}')
             return amount_str
 number_converter = NumberToWordsConverter()
+# Проходы convert_numbers_in_text в порядке приоритета: время, дата, деньги, число
+_TEXT_PASSES = ((re.compile('\\b\\d{1,2}[:.]\\d{2}\\b'), number_converter.convert_time), (re.compile('\\b\\d{1,2}[./]\\d{1,2}[./]\\d{4}\\b'), number_converter.convert_date), (re.compile('Text cleaned.'), number_converter.convert_money), (re.compile('\\b\\d+\\b'), number_converter.convert_number))
+# Все проходы одной альтернацией: текст сканируется один раз, lastindex указывает сработавший проход
+_COMBINED_TEXT_RE = re.compile('|'.join((f'({pattern.pattern})' for (pattern, _) in _TEXT_PASSES)))
+_HAS_DIGIT = re.compile('\\d').search
+
+def _convert_match(match) -> str:
+    index = match.lastindex - 1
+    converted = _TEXT_PASSES[index][1](match.group())
+    if _HAS_DIGIT(converted):
+        # Конвертер вернул цифры (не разобрал формат) - досконвертируем их следующими проходами, как при последовательной замене
+        for (pattern, converter) in _TEXT_PASSES[index + 1:]:
+            converted = pattern.sub(lambda m, converter=converter: converter(m.group()), converted)
+    return converted
 
 def convert_numbers_in_text(text: str) -> str:
     """
@@ -316,12 +337,10 @@ def convert_numbers_in_text(text: str) -> str:
     Returns:
         Текст с числами, замененными на слова
     """
+    if not _HAS_DIGIT(text):
+        return text
     try:
-        patterns = [('\\b(\\d{1,2}[:.]\\d{2})\\b', lambda m: number_converter.convert_time(m.group(1))), ('\\b(\\d{1,2}[./]\\d{1,2}[./]\\d{4})\\b', lambda m: number_converter.convert_date(m.group(1))), ('Text cleaned.', lambda m: number_converter.convert_money(m.group(0))), ('\\b(\\d+)\\b', lambda m: number_converter.convert_number(m.group(1)))]
-        result = text
-        for (pattern, converter) in patterns:
-            result = re.sub(pattern, converter, result)
-        return result
+        return _COMBINED_TEXT_RE.sub(_convert_match, text)
     except Exception:
         logger.exception('Ошибка конвертации чисел в тексте')
         return text
@@ -1,12 +1,19 @@
 """
 Мультиязычная реализация F5-TTS с поддержкой русского и английского языков
 """
+import asyncio
+import bisect
+import functools
 import logging
 import os
 import re
+import secrets
+import shutil
+import threading
+import time
+from collections import OrderedDict
 from pathlib import Path
-from typing import Optional
-import tempfile
+import wave
 import numpy as np
 import soundfile as sf
 import torch
@@ -20,14 +27,65 @@ from .date_converter import convert_all_dates_in_text
 from .money_converter import convert_all_money_in_text
 try:
     from ..config import config
+    from ..database import SessionLocal, Voice as VoiceModel
 except ImportError:
     from config import config
+    from database import SessionLocal, Voice as VoiceModel
 logger = logging.getLogger(__name__)
 MODEL_ID = 'Misha24-10/F5-TTS_RUSSIAN'
 CHECKPOINT = 'F5TTS_v1_Base_v2/model_last_inference.safetensors'
 VOCAB = 'F5TTS_v1_Base/vocab.txt'
+VOICE_PATH_TTL = 5.0
+VOICE_PATH_MAXSIZE = 256
+# Конвертеры дат, времени, денег и чисел срабатывают только на цифрах
+_HAS_DIGIT = re.compile('\\d').search
+# Заполняется из потоков executor'а, поэтому вытеснение и запись идут под блокировкой
+_voice_path_cache: OrderedDict = OrderedDict()
+_voice_path_lock = threading.Lock()
+
+def invalidate_voice_references() -> None:
+    """Сбросить кэш путей и транскрипций голосов (вызывать после переименования, удаления или правки голоса)"""
+    with _voice_path_lock:
+        _voice_path_cache.clear()
+
 DEFAULT_VOICE_TRANSCRIPTION = 'Создавая уникальные цифровые объекты, вы размышляете о том насколько интересны ваши идеи миру, но задумываетель ли вы, как защитить права на свои произведения.'
 
+def _find_cached_model_file(cache_dir: Path, *relative_names: str) -> Path | None:
+    """Ищет файл модели во всех локальных снапшотах HF-кэша (сначала 'main') одним проходом по snapshots/."""
+    snapshots_dir = cache_dir / ('models--' + MODEL_ID.replace('/', '--')) / 'snapshots'
+    try:
+        with os.scandir(snapshots_dir) as it:
+            snapshots = sorted((entry.path for entry in it if entry.is_dir()), key=lambda path: os.path.basename(path) != 'main')
+    except OSError:
+        return None
+    for snapshot in snapshots:
+        for relative_name in relative_names:
+            candidate = Path(snapshot) / relative_name
+            if candidate.is_file():
+                return candidate
+    return None
+
+def _write_pcm16_wav(output_path, audio: np.ndarray, sample_rate: int, gain: float=1.0, bounded: bool=False, trailing_silence: int=0) -> None:
+    """Пишет float-аудио как 16-bit PCM WAV; усиление, клиппинг и квантование — один проход в float32 буфере.
+
+    bounded=True означает, что audio уже лежит в [-1, 1] (например, прочитано из PCM-файла):
+    при gain <= 1.0 клиппинг тогда не нужен и пропускается.
+    trailing_silence — число нулевых сэмплов, дописываемых в конец без копирования audio в новый буфер.
+    """
+    scaled = np.multiply(audio, np.float32(gain * 32767.0), dtype=np.float32)
+    if not (bounded and gain <= 1.0):
+        np.clip(scaled, -32767.0, 32767.0, out=scaled)
+    np.rint(scaled, out=scaled)
+    pcm16 = scaled.astype('<i2')
+    channels = pcm16.shape[1] if pcm16.ndim > 1 else 1
+    with wave.open(str(output_path), 'wb') as wav_file:
+        wav_file.setnchannels(channels)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(int(sample_rate))
+        wav_file.writeframes(pcm16.tobytes())
+        if trailing_silence > 0:
+            wav_file.writeframes(bytes(2 * channels * trailing_silence))
+
 class RussianTTS:
 
     def __init__(self, enable_accent=True, accent_model_size='turbo', ode_method='euler', use_ema=True):
@@ -48,6 +106,11 @@ class RussianTTS:
         logger.info(f'F5-TTS использует устройство: {self.device}')
         self.tts_model = None
         self.accentizer = None
+        self._infer_cache: OrderedDict = OrderedDict()
+        self._infer_cache_size = config.infer_cache_size
+        self._infer_cache_max_bytes = config.infer_cache_max_mb << 20
+        self._infer_cache_bytes = 0
+        self._infer_cache_lock = threading.Lock()
         try:
             self._load_models()
         except Exception:
@@ -58,6 +121,43 @@ class RussianTTS:
         """Проверяет, готов ли TTS движок к работе."""
         return self.tts_model is not None
 
+    def _infer_cached(self, tts_model, infer_params: dict):
+        """tts_model.infer с LRU-кэшем по параметрам и mtime референсного файла (повторные фразы тем же голосом)
+
+        Кэш ограничен и числом записей (config.infer_cache_size, 0 - выключен), и суммарным размером волн.
+        """
+        if self._infer_cache_size <= 0:
+            return tts_model.infer(**infer_params)
+        try:
+            ref_mtime = os.stat(infer_params['ref_file']).st_mtime_ns
+        except OSError:
+            return tts_model.infer(**infer_params)
+        cache_key = (ref_mtime, tuple(infer_params.items()))
+        with self._infer_cache_lock:
+            cached = self._infer_cache.get(cache_key)
+            if cached is not None:
+                self._infer_cache.move_to_end(cache_key)
+        if cached is not None:
+            logger.info('Infer cache hit, skipping F5-TTS inference')
+            return (cached[0], cached[1], None)
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
+        (wav, sr, spect) = tts_model.infer(**infer_params)
+        wav = np.asarray(wav)
+        if wav.nbytes > self._infer_cache_max_bytes:
+            return (wav, sr, spect)
+        wav.flags.writeable = False
+        with self._infer_cache_lock:
+            previous = self._infer_cache.pop(cache_key, None)
+            if previous is not None:
+                self._infer_cache_bytes -= previous[0].nbytes
+            self._infer_cache[cache_key] = (wav, sr)
+            self._infer_cache_bytes += wav.nbytes
+            while len(self._infer_cache) > self._infer_cache_size or self._infer_cache_bytes > self._infer_cache_max_bytes:
+                (evicted, _) = self._infer_cache.popitem(last=False)[1]
+                self._infer_cache_bytes -= evicted.nbytes
+        return (wav, sr, spect)
+
     def _load_models(self):
         """Загружает F5-TTS модели и RUAccent."""
         try:
@@ -83,13 +183,8 @@ class RussianTTS:
             logger.info('Загружаем F5-TTS модель...')
             cache_dir = Path('f5_tts_cache')
             cache_dir.mkdir(exist_ok=True)
-            possible_paths = [cache_dir / 'models--Misha24-10--F5-TTS_RUSSIAN' / 'snapshots' / 'main' / 'F5TTS_v1_Base_v2' / 'model_last_inference.safetensors', cache_dir / 'models--Misha24-10--F5-TTS_RUSSIAN' / 'snapshots' / '4f5ee5def0435265fe6ecf2143df2ef26d926b62' / 'F5TTS_v1_Base_v2' / 'model_last_inference.safetensors']
-            local_ckpt_path = None
-            for path in possible_paths:
-                if path.exists():
-                    local_ckpt_path = path
-                    break
-            if local_ckpt_path and local_ckpt_path.exists():
+            local_ckpt_path = _find_cached_model_file(cache_dir, CHECKPOINT)
+            if local_ckpt_path:
                 logger.info(f'Text cleaned.{local_ckpt_path}')
                 ckpt_path = str(local_ckpt_path)
             else:
@@ -100,13 +195,8 @@ class RussianTTS:
                     logger.error(f'Ошибка загрузки модели: {download_error}')
                     logger.info('Попробуйте скачать модель вручную или проверьте интернет-соединение')
                     raise RuntimeError('Не удалось загрузить TTS модель')
-            vocab_possible_paths = [cache_dir / 'models--Misha24-10--F5-TTS_RUSSIAN' / 'snapshots' / 'main' / 'vocab.txt', cache_dir / 'models--Misha24-10--F5-TTS_RUSSIAN' / 'snapshots' / '4f5ee5def0435265fe6ecf2143df2ef26d926b62' / 'F5TTS_v1_Base' / 'vocab.txt']
-            local_vocab_path = None
-            for path in vocab_possible_paths:
-                if path.exists():
-                    local_vocab_path = path
-                    break
-            if local_vocab_path and local_vocab_path.exists():
+            local_vocab_path = _find_cached_model_file(cache_dir, 'vocab.txt', VOCAB)
+            if local_vocab_path:
                 logger.info(f'Text cleaned.{local_vocab_path}')
                 vocab_path = str(local_vocab_path)
             else:
@@ -121,7 +211,6 @@ class RussianTTS:
                 if torch.cuda.is_available():
                     torch.cuda.empty_cache()
                     torch.cuda.synchronize()
-                import os
                 os.environ['HF_HOME'] = str(cache_dir.absolute())
                 os.environ['HUGGINGFACE_HUB_CACHE'] = str(cache_dir.absolute())
                 os.environ['HF_HUB_DISABLE_PROGRESS_BARS'] = '1'
@@ -179,12 +268,11 @@ class RussianTTS:
         text_no_spaces = text.replace(' ', '')
         if not text_no_spaces:
             return True
-        has_letter_or_digit = any((c.isalnum() or c.isalpha() or c.isdigit() for c in text_no_spaces))
+        has_letter_or_digit = any((c.isalnum() for c in text_no_spaces))
         return not has_letter_or_digit
 
     def _remove_long_symbol_sequences(self, text: str) -> str:
         """Удаляет последовательности из более чем 3 знаков подряд."""
-        import re
         pattern = '(.)\\1{3,}'
         return re.sub(pattern, '\\1\\1\\1', text)
 
@@ -192,7 +280,6 @@ class RussianTTS:
         """Добавляет ударения к русскому тексту."""
         if not self.accentizer or not text.strip():
             return text
-        import re
         text = re.sub('\\s+', ' ', text.strip())
         try:
             if hasattr(self.accentizer, 'process_all'):
@@ -210,7 +297,6 @@ class RussianTTS:
 
     def preprocess_text_for_tts(self, text: str) -> str:
         """Предобработка текста с учетом языка и конвертацией чисел."""
-        import re
         processed_text = re.sub('\\s+', ' ', text.strip())
         if not processed_text:
             return ''
@@ -231,25 +317,26 @@ class RussianTTS:
                 logger.info(f"После ёфикации: '{processed_text}'")
             except Exception:
                 logger.warning('Ошибка ёфикации', exc_info=True)
-        if language == 'russian':
+        has_digits = language == 'russian' and _HAS_DIGIT(processed_text) is not None
+        if has_digits:
             try:
                 processed_text = convert_all_dates_in_text(processed_text)
                 logger.info(f"После конвертации дат: '{processed_text}'")
             except Exception:
                 logger.warning('Ошибка конвертации дат', exc_info=True)
-        if language == 'russian':
+        if has_digits:
             try:
                 processed_text = convert_all_time_in_text(processed_text)
                 logger.info(f"После конвертации времени: '{processed_text}'")
             except Exception:
                 logger.warning('Ошибка конвертации времени', exc_info=True)
-        if language == 'russian':
+        if has_digits:
             try:
                 processed_text = convert_all_money_in_text(processed_text)
                 logger.info(f"После конвертации денежных сумм: '{processed_text}'")
             except Exception:
                 logger.warning('Ошибка конвертации денежных сумм', exc_info=True)
-        if language == 'russian':
+        if has_digits:
             try:
                 processed_text = convert_numbers_in_text(processed_text)
                 logger.info(f"После конвертации чисел: '{processed_text}'")
@@ -267,9 +354,14 @@ class RussianTTS:
         processed_text = re.sub('\\s+', ' ', processed_text).strip()
         logger.info(f"Обработанный текст: '{processed_text}'")
         return processed_text
+    # Границы длины текста (без пробелов) для выбора индекса скорости: <=3, <=8, <=18, <=35, <=45, больше
+    SPEED_LENGTH_BOUNDS = (3, 8, 18, 35, 45)
+    FALLBACK_SPEED_VALUES = {'russian': (0.1, 0.3, 0.6, 0.8, 0.9, 1.0), 'english': (0.1, 0.2, 0.3, 0.4, 0.5, 0.6)}
     SPEED_PRESETS = {'very_slow': {'name': 'Очень медленный', 'description': 'Максимально медленная речь', 'settings': {'russian': [0.1, 0.3, 0.6, 0.8, 0.9, 1.0], 'english': [0.1, 0.2, 0.3, 0.4, 0.5, 0.6]}}, 'slow': {'name': 'Медленный', 'description': 'Замедленная речь', 'settings': {'russian': [0.3, 0.6, 0.8, 0.9, 0.9, 1.0], 'english': [0.2, 0.4, 0.5, 0.7, 0.7, 0.8]}}, 'normal': {'name': 'Нормальный', 'description': 'Обычная скорость речи', 'settings': {'russian': [0.5, 0.8, 1.0, 1.0, 1.0, 1.0], 'english': [0.3, 0.7, 0.8, 0.9, 1.0, 1.0]}}, 'fast': {'name': 'Быстрый', 'description': 'Ускоренная речь', 'settings': {'russian': [0.8, 1.0, 1.2, 1.3, 1.4, 1.5], 'english': [0.7, 1.0, 1.1, 1.2, 1.3, 1.3]}}, 'very_fast': {'name': 'Очень быстрый', 'description': 'Максимально ускоренная речь', 'settings': {'russian': [0.8, 1.1, 1.4, 1.5, 1.6, 1.8], 'english': [0.7, 1.0, 1.3, 1.5, 1.6, 1.7]}}}
+    # (пресет, язык) -> скорости по длине текста, уже ограниченные [0.1, 2.0]
+    SPEED_TABLE = {(preset, lang): tuple((max(0.1, min(2.0, value)) for value in values)) for (preset, info) in SPEED_PRESETS.items() for (lang, values) in info['settings'].items()}
 
-    def synthesize_speech(self, text: str, ref_audio_path: str, ref_text: str='', speed: float=None, nfe_step: int=None, fix_duration: Optional[float]=None, remove_silence: bool=False, seed: Optional[int]=None, cfg_strength: float=None, target_rms: float=None, speed_preset: str='normal') -> Optional[str]:
+    def synthesize_speech(self, text: str, ref_audio_path: str, ref_text: str='', speed: float=None, nfe_step: int=None, fix_duration: float | None=None, remove_silence: bool=False, seed: int | None=None, cfg_strength: float=None, target_rms: float=None, speed_preset: str='normal') -> str | None:
         """Синтезирует речь с автоматическим выбором модели по языку."""
         processed_text = self.preprocess_text_for_tts(text)
         if not processed_text:
@@ -283,57 +375,21 @@ class RussianTTS:
         cross_fade_duration = config.cross_fade_duration
         silence_duration_ms = config.silence_duration_ms
         sway_sampling_coef = config.sway_sampling_coef
+        length_without_spaces = len(processed_text.replace(' ', ''))
         if speed is None:
-            length_without_spaces = len(processed_text.replace(' ', ''))
-            if speed_preset in self.SPEED_PRESETS:
-                preset_settings = self.SPEED_PRESETS[speed_preset]['settings']
-                language_key = language if language in preset_settings else 'russian'
-                speed_values = preset_settings[language_key]
-                if length_without_spaces <= 3:
-                    speed = speed_values[0]
-                elif length_without_spaces <= 8:
-                    speed = speed_values[1]
-                elif length_without_spaces <= 18:
-                    speed = speed_values[2]
-                elif length_without_spaces <= 35:
-                    speed = speed_values[3]
-                elif length_without_spaces <= 45:
-                    speed = speed_values[4]
-                else:
-                    speed = speed_values[5]
+            speed_tier = bisect.bisect_left(self.SPEED_LENGTH_BOUNDS, length_without_spaces)
+            language_key = 'english' if language == 'english' else 'russian'
+            preset_speeds = self.SPEED_TABLE.get((speed_preset, language_key))
+            if preset_speeds is not None:
+                speed = preset_speeds[speed_tier]
                 logger.info(f"Применен пресет скорости '{speed_preset}': {self.SPEED_PRESETS[speed_preset]['name']}")
                 logger.info(f'Скорость для {language} (длина: {length_without_spaces}): {speed}')
             else:
-                if language == 'english':
-                    if length_without_spaces <= 3:
-                        speed = 0.1
-                    elif length_without_spaces <= 8:
-                        speed = 0.2
-                    elif length_without_spaces <= 18:
-                        speed = 0.3
-                    elif length_without_spaces <= 35:
-                        speed = 0.4
-                    elif length_without_spaces <= 45:
-                        speed = 0.5
-                    else:
-                        speed = 0.6
-                elif length_without_spaces <= 3:
-                    speed = 0.1
-                elif length_without_spaces <= 8:
-                    speed = 0.3
-                elif length_without_spaces <= 18:
-                    speed = 0.6
-                elif length_without_spaces <= 35:
-                    speed = 0.8
-                elif length_without_spaces <= 45:
-                    speed = 0.9
-                else:
-                    speed = 1.0
+                speed = self.FALLBACK_SPEED_VALUES[language_key][speed_tier]
                 logger.info(f'Text cleaned.{language}: {speed}Text cleaned.{length_without_spaces})')
-        if speed is not None:
+        else:
             speed = max(0.1, min(2.0, speed))
         if nfe_step is None:
-            length_without_spaces = len(processed_text.replace(' ', ''))
             if length_without_spaces > 120:
                 nfe_step = 18
             else:
@@ -352,17 +408,15 @@ class RussianTTS:
         try:
             output_dir = config.temp_audio_path
             output_dir.mkdir(parents=True, exist_ok=True)
-            import time
             timestamp = int(time.time() * 1000)
-            output_filename = f'{language}_{timestamp}.wav'
+            # Случайный суффикс: имена не совпадают ни между потоками, ни между процессами
+            output_filename = f'{language}_{timestamp}_{secrets.token_hex(8)}.wav'
             output_path = output_dir / output_filename
-            infer_params = {'ref_file': ref_audio_path, 'ref_text': ref_text_to_use, 'gen_text': processed_text, 'cross_fade_duration': cross_fade_duration, 'speed': speed, 'target_rms': target_rms, 'sway_sampling_coef': sway_sampling_coef, 'cfg_strength': cfg_strength, 'nfe_step': nfe_step, 'remove_silence': remove_silence, 'seed': int(time.time() * 1000) % 2 ** 32}
+            infer_params = {'ref_file': ref_audio_path, 'ref_text': ref_text_to_use, 'gen_text': processed_text, 'cross_fade_duration': cross_fade_duration, 'speed': speed, 'target_rms': target_rms, 'sway_sampling_coef': sway_sampling_coef, 'cfg_strength': cfg_strength, 'nfe_step': nfe_step, 'remove_silence': remove_silence}
             if speed is not None:
                 infer_params['speed'] = float(speed)
             if fix_duration is not None:
                 infer_params['fix_duration'] = fix_duration
-            if seed is not None:
-                infer_params['seed'] = seed
             logger.info(f'[SETTINGS] Финальные параметры синтеза:')
             logger.info(f'  - cross_fade={cross_fade_duration}, speed={speed}, silence={silence_duration_ms}ms')
             logger.info(f'  - target_rms={target_rms}, sway={sway_sampling_coef}, cfg={cfg_strength}, nfe={nfe_step}')
@@ -376,13 +430,7 @@ class RussianTTS:
             logger.info(f'  - speed: {speed} (тип: {type(speed)})')
             logger.info(f'  - nfe_step: {nfe_step} (тип: {type(nfe_step)})')
             try:
-                infer_params_safe = infer_params.copy()
-                if 'seed' in infer_params_safe:
-                    del infer_params_safe['seed']
-                    logger.info('Text cleaned.')
-                if torch.cuda.is_available():
-                    torch.cuda.empty_cache()
-                (wav, sr, spect) = tts_model.infer(**infer_params_safe)
+                (wav, sr, spect) = self._infer_cached(tts_model, infer_params)
                 duration_seconds = len(wav) / sr
                 expected_duration = len(processed_text.split()) * 0.5
                 if speed and speed != 1.0:
@@ -402,27 +450,24 @@ class RussianTTS:
                     (wav, sr, spect) = tts_model.infer(**minimal_params)
                 else:
                     raise
-            wav_rms = np.sqrt(np.mean(wav ** 2)) if len(wav) > 0 else 0
+            wav = np.asarray(wav)
+            wav_energy = float(np.dot(wav, wav)) if len(wav) > 0 else 0.0
+            wav_rms = np.sqrt(wav_energy / len(wav)) if len(wav) > 0 else 0
             wav_max = np.max(np.abs(wav)) if len(wav) > 0 else 0
             logger.info(f'Text cleaned.{wav_rms:.10f}, Max={wav_max:.10f}Text cleaned.{len(wav)}Text cleaned.')
+            # Хвост: тишина (>= 800 мс) + 100 мс дописывается нулями при записи, без копии wav в
+            # дополненный буфер; затухание на последних 300 мс не нужно — они всегда приходятся на тишину.
             extended_silence_ms = max(silence_duration_ms, 800)
             silence_samples = int(sr * (extended_silence_ms / 1000.0))
-            silence = np.zeros(silence_samples, dtype=np.float32)
-            wav_padded = np.concatenate([wav, silence])
-            fade_samples = int(sr * 0.3)
-            if len(wav_padded) > fade_samples:
-                fade = np.cos(np.linspace(0, np.pi / 2, fade_samples))
-                wav_padded[-fade_samples:] *= fade
             post_fade_silence = int(sr * 0.1)
-            post_silence = np.zeros(post_fade_silence, dtype=np.float32)
-            wav_padded = np.concatenate([wav_padded, post_silence])
-            current_rms = np.sqrt(np.mean(wav_padded ** 2))
-            logger.info(f'Text cleaned.{current_rms:.10f}, Max аплитуда: {np.max(np.abs(wav_padded)):.10f}')
+            tail_samples = silence_samples + post_fade_silence
+            current_rms = np.sqrt(wav_energy / (len(wav) + tail_samples))
+            logger.info(f'Text cleaned.{current_rms:.10f}, Max аплитуда: {wav_max:.10f}')
             if current_rms == 0:
                 logger.error('Text cleaned.')
-            sf.write(str(output_path), wav_padded, sr)
+            _write_pcm16_wav(output_path, wav, sr, trailing_silence=tail_samples)
             logger.info(f'Аудио синтезировано и сохранено в {output_path} (модель: {model_name})')
-            return str(output_path.resolve())
+            return str(output_path)
         except Exception:
             logger.exception('Ошибка при синтезе')
             return None
@@ -442,11 +487,12 @@ class RussianTTS:
             if not os.path.exists(audio_path):
                 logger.error(f'Audio file not found: {audio_path}')
                 return False
-            (audio_data, sample_rate) = sf.read(audio_path)
+            with sf.SoundFile(audio_path) as audio_file:
+                is_pcm = audio_file.subtype.startswith('PCM')
+                sample_rate = audio_file.samplerate
+                audio_data = audio_file.read(dtype='float32')
             volume_multiplier = volume_level / 50.0
-            audio_data_modified = audio_data * volume_multiplier
-            audio_data_modified = np.clip(audio_data_modified, -1.0, 1.0)
-            sf.write(audio_path, audio_data_modified, sample_rate)
+            _write_pcm16_wav(audio_path, audio_data, sample_rate, gain=volume_multiplier, bounded=is_pcm)
             logger.info(f'Volume applied to audio: {audio_path}, level: {volume_level}%, multiplier: {volume_multiplier:.2f}x')
             return True
         except Exception:
@@ -455,18 +501,26 @@ class RussianTTS:
 
     async def synthesize(self, text: str, voice_name: str, output_path: str, volume_level: float=50.0, **kwargs) -> bool:
         """Text cleaned."""
+        # Поиск голоса в БД, инференс, копирование и громкость — блокирующие операции,
+        # поэтому весь пайплайн выполняется одной задачей в пуле потоков.
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(None, functools.partial(self._synthesize_to_file, text, voice_name, output_path, volume_level, **kwargs))
+
+    def _synthesize_to_file(self, text: str, voice_name: str, output_path: str, volume_level: float=50.0, **kwargs) -> bool:
+        """Синхронная часть synthesize: синтез в output_path с применением громкости."""
         try:
-            voice_audio_path = self._get_voice_audio_path(voice_name)
+            (voice_audio_path, voice_ref_text) = self._get_voice_reference(voice_name)
             if not voice_audio_path:
                 logger.error(f'Voice audio not found for voice: {voice_name}')
                 return False
             logger.info(f'[FIX] Synthesize called with kwargs: {kwargs}')
-            result_path = self.synthesize_speech(text=text, ref_audio_path=voice_audio_path, ref_text='' ** kwargs)
+            # Сохранённая транскрипция референса избавляет F5 от повторного распознавания при каждом синтезе
+            ref_text = kwargs.pop('ref_text', None) or voice_ref_text
+            result_path = self.synthesize_speech(text=text, ref_audio_path=voice_audio_path, ref_text=ref_text, **kwargs)
             if not result_path or not os.path.exists(result_path):
                 logger.error(f'Synthesis failed or output file not created: {result_path}')
                 return False
             if result_path != output_path:
-                import shutil
                 shutil.copy2(result_path, output_path)
                 try:
                     os.remove(result_path)
@@ -481,35 +535,45 @@ class RussianTTS:
             logger.exception('Error in synthesize method')
             return False
 
-    def _get_voice_audio_path(self, voice_name: str) -> str:
+    def _get_voice_reference(self, voice_name: str) -> tuple[str | None, str]:
+        """Путь к референсному аудио голоса и его транскрипция; найденные голоса кэшируются на VOICE_PATH_TTL секунд."""
+        now = time.monotonic()
+        cached = _voice_path_cache.get(voice_name)
+        if cached and cached[0] > now:
+            return cached[1]
+        reference = self._resolve_voice_reference(voice_name)
+        if reference[0]:
+            with _voice_path_lock:
+                _voice_path_cache[voice_name] = (now + VOICE_PATH_TTL, reference)
+                _voice_path_cache.move_to_end(voice_name)
+                if len(_voice_path_cache) > VOICE_PATH_MAXSIZE:
+                    _voice_path_cache.popitem(last=False)
+        return reference
+
+    def _resolve_voice_reference(self, voice_name: str) -> tuple[str | None, str]:
         """Text cleaned."""
         try:
-            from database import get_db, Voice as VoiceModel
-            db = next(get_db())
+            db = SessionLocal()
             try:
-                voice = db.query(VoiceModel).filter(VoiceModel.name == voice_name).first()
+                voice = db.query(VoiceModel.file_path, VoiceModel.reference_text).filter(VoiceModel.name == voice_name).first()
                 if voice and voice.file_path:
                     voice_path = Path(voice.file_path)
                     if voice_path.exists():
-                        return str(voice_path)
+                        return (str(voice_path), voice.reference_text or '')
                     else:
                         logger.warning(f'Voice file path exists in DB but file not found: {voice.file_path}')
             finally:
                 db.close()
-            from config import config
             voices_dir = config.voices_path
-            voice_file = voices_dir / f'{voice_name}.wav'
-            if voice_file.exists():
-                return str(voice_file)
             for ext in ['.wav', '.mp3', '.flac']:
                 voice_file = voices_dir / f'{voice_name}{ext}'
                 if voice_file.exists():
-                    return str(voice_file)
+                    return (str(voice_file), '')
             logger.warning(f'Voice audio file not found for: {voice_name}')
-            return None
+            return (None, '')
         except Exception:
             logger.exception('Error getting voice audio path for {voice_name}')
-            return None
+            return (None, '')
 if __name__ == '__main__':
     tts = RussianTTS()
     if tts.russian_tts:
@@ -7,13 +7,132 @@
 
 import os
 import re
-import codecs
 import logging
 from pathlib import Path
 
 # Настройка логирования
 logger = logging.getLogger(__name__)
 
+# Таблицы дополнительных правил строятся один раз при импорте, а не на каждое слово
+_COMMON_WORDS = {
+    "еще": "ещё",
+    "ее": "её", 
+    "телка": "тёлка",
+    "осел": "осёл",
+    "произнес": "произнёс",
+    "шел": "шёл",
+    "вел": "вёл",
+    "жел": "жёл",
+    "мел": "мёл",
+    "тел": "тёл",
+    "че": "чё",
+    "чё": "чё",
+    # Дополнительные частые слова
+    "все": "всё",
+    "всего": "всего",  # не ёфицируем
+    "всегда": "всегда",  # не ёфицируем
+    "везде": "везде",  # не ёфицируем
+    "всех": "всех",  # не ёфицируем
+    "всем": "всем",  # не ёфицируем
+    "всеми": "всеми",  # не ёфицируем
+    "всему": "всему",  # не ёфицируем
+    "всей": "всей",  # не ёфицируем
+    "всю": "всю",  # не ёфицируем
+    "всё": "всё",  # уже ёфицировано
+    "цена": "цена"  # не ёфицируем
+}
+_EL_EXCEPTIONS = frozenset([
+    # Общие исключения
+    "медведь", "привет", "удел", "предел", "дела", "как", "гетеро",
+    # Глаголы, которые не меняют "е" на "ё"
+    "хотел", "хотела", "хотели", "хотело",
+    "умел", "умела", "умели", "умело",
+    "смел", "смела", "смели", "смело",
+    "имел", "имела", "имели", "имело",
+    "сел", "села", "сели", "село",
+    "пел", "пела", "пели", "пело",
+    # Глаголы, которые вообще не используют "ё"
+    "смотрел", "смотрела", "смотрели",
+    "думал", "думала", "думали",
+    "знал", "знала", "знали",
+    "был", "была", "были", "было",
+    "жил", "жила", "жили", "жило",
+    "пил", "пила", "пили", "пило",
+    "ел", "ела", "ели", "ело",
+    "спал", "спала", "спали", "спало",
+    "встал", "встала", "встали", "встало",
+    "упал", "упала", "упали", "упало",
+    "взял", "взяла", "взяли", "взяло",
+    "дал", "дала", "дали", "дало",
+    "стал", "стала", "стали", "стало",
+    "читал", "читала", "читали",
+    "писал", "писала", "писали",
+    "рисовал", "рисовала", "рисовали",
+    "играл", "играла", "играли",
+    "работал", "работала", "работали",
+    "учился", "училась", "учились",
+    "гулял", "гуляла", "гуляли",
+    "ходил", "ходила", "ходили",
+    "бегал", "бегала", "бегали",
+    "прыгал", "прыгала", "прыгали",
+    "танцевал", "танцевала", "танцевали",
+    "учил", "учила", "учили",
+    "слушал", "слушала", "слушали",
+    "говорил", "говорила", "говорили",
+    "понимал", "понимала", "понимали",
+    "чувствовал", "чувствовала", "чувствовали",
+    # Дополнительные исключения
+    "летел", "летела", "летели", "летело",
+    "сидел", "сидела", "сидели", "сидело",
+    "лежал", "лежала", "лежали", "лежало",
+    "стоял", "стояла", "стояли", "стояло",
+    "висел", "висела", "висели", "висело",
+    "светел", "светела", "светели", "светело",
+    "темнел", "темнела", "темнели", "темнело",
+    "зеленел", "зеленела", "зеленели", "зеленело",
+    "краснел", "краснела", "краснели", "краснело",
+    "белел", "белела", "белели", "белело",
+    "чернел", "чернела", "чернели", "чернело",
+    "желтел", "желтела", "желтели", "желтело",
+    "синел", "синела", "синели", "синело"
+])
+_A_EXCEPTIONS = frozenset([
+    "дела", "щелка", "мелка", "желтка", "белка", "зеленка", "краснка", "стена", "ерунда",
+    "река", "лека", "мека", "нека", "века", "сека", "тека", "чека", "шека", "щека",
+    "беда", "неда", "веда", "седа", "теда", "чеда", "шеда", "щеда",
+    "мера", "вера", "сера", "тера", "чера", "шера", "щера",
+    "нега", "вега", "сега", "тега", "чега", "шега", "щега",
+    "меха", "веха", "сеха", "теха", "чеха", "шеха", "щеха",
+    "меча", "веча", "сеча", "теча", "чеча", "шеча", "щеча",
+    "меша", "веша", "сеша", "теша", "чеша", "шеша", "щеша",
+    "меща", "веща", "сеща", "теща", "чеща", "шеща", "щеща",
+    # [START] FIX: Слова, которые НЕ должны ёфицироваться
+    "проверка", "сверка", "переверка", "неверка",
+    # Слова с "ерк" в корне - обычно не ёфицируются (но некоторые могут быть в словаре)
+    "берка", "верка", "дерка", "жерка", "зерка", "перка", "серка", "терка", "черка", "шерка", "щерка"
+])
+_O_EXCEPTIONS = frozenset([
+    "дело", "место", "время", "небо", "поле", "море", "озеро", "дерево", "гетеро",
+    "честно", "реально", "идеально", "легально", "нормально", "формально",
+    "цена", "веко", "село", "тело", "чело", "шело", "щело",
+    "серо", "теро", "черо", "шеро", "щеро",
+    "него", "вего", "сего", "тего", "чего", "шего", "щего",
+    "мехо", "вехо", "сехо", "техо", "чехо", "шехо", "щехо",
+    "мечо", "вечо", "сечо", "течо", "чечо", "шечо", "щечо",
+    "мешо", "вешо", "сешо", "тешо", "чешо", "шешо", "щешо",
+    "мещо", "вещо", "сещо", "тещо", "чещо", "шещо", "щещо",
+    "мело", "вело", "село", "тело", "чело", "шело", "щело",
+    "медо", "ведо", "седо", "тедо", "чедо", "шедо", "щедо",
+    "меко", "веко", "секо", "теко", "чеко", "шеко", "щеко",
+    "мего", "вего", "сего", "тего", "чего", "шего", "щего",
+    "мехо", "вехо", "сехо", "техо", "чехо", "шехо", "щехо",
+    "мечо", "вечо", "сечо", "течо", "чечо", "шечо", "щечо",
+    "мешо", "вешо", "сешо", "тешо", "чешо", "шешо", "щешо",
+    "мещо", "вещо", "сещо", "тещо", "чещо", "шещо", "щещо"
+])
+_A_ROOT_RE = re.compile(r'е([^ё]*а)$')
+_O_ROOT_RE = re.compile(r'е([^ё]*о)$')
+
 class Yoficator:
     """Ёфикатор для русского текста"""
     
@@ -40,27 +159,27 @@ class Yoficator:
     def _load_dictionary(self):
         """Загружает словарь для ёфикации"""
         try:
-            with codecs.open(self.dictionary_path, "r", "utf-8") as f:
+            # str.replace вместо re.sub на каждую запись: словарь содержит сотни тысяч строк
+            dictionary = {}
+            with open(self.dictionary_path, "r", encoding="utf-8") as f:
                 for line in f:
-                    if not "*" in line:
-                        cline = line.rstrip('\n')
-                        if "(" in cline:
-                            bline, sline = cline.split("(")
-                            sline = re.sub(r'\)', '', sline)
-                        else:
-                            bline = cline
-                            sline = ""
-                        
-                        if "|" in sline:
-                            ssline = sline.split("|")
-                            for ss in ssline:
-                                value = bline + ss
-                                key = re.sub(r'ё', 'е', value)
-                                self.dictionary[key] = value
-                        else:
-                            value = bline
-                            key = re.sub(r'ё', 'е', value)
-                            self.dictionary[key] = value
+                    if "*" in line:
+                        continue
+                    cline = line.rstrip('\n')
+                    if "(" in cline:
+                        bline, sline = cline.split("(")
+                        sline = sline.replace(')', '')
+                    else:
+                        bline = cline
+                        sline = ""
+                    
+                    if "|" in sline:
+                        for ss in sline.split("|"):
+                            value = bline + ss
+                            dictionary[value.replace('ё', 'е')] = value
+                    else:
+                        dictionary[bline.replace('ё', 'е')] = bline
+            self.dictionary = dictionary
             
             logger.info(f"Словарь ёфикации загружен успешно. Записей: {len(self.dictionary)}")
         except FileNotFoundError:
@@ -84,13 +203,18 @@ class Yoficator:
         tokens = self.splitter.findall(text)
         result = []
         
+        dictionary = self.dictionary
+        apply_rules = self._apply_additional_rules
         for token in tokens:
-            if token in self.dictionary:
-                result.append(self.dictionary[token])
-            else:
+            value = dictionary.get(token)
+            if value is not None:
+                result.append(value)
+            elif 'е' in token:
                 # Дополнительные правила для слов, которых нет в словаре
-                yoficated_token = self._apply_additional_rules(token)
-                result.append(yoficated_token)
+                result.append(apply_rules(token))
+            else:
+                # Все правила меняют только строчную "е": без неё токен остаётся как есть
+                result.append(token)
         
         return ''.join(result)
     
@@ -99,153 +223,39 @@ class Yoficator:
         if not word or not word.isalpha():
             return word
         
-        import re
         word_lower = word.lower()
         
         # 1. Частые слова и исключения
-        common_words = {
-            "еще": "ещё",
-            "ее": "её", 
-            "телка": "тёлка",
-            "осел": "осёл",
-            "произнес": "произнёс",
-            "шел": "шёл",
-            "вел": "вёл",
-            "жел": "жёл",
-            "мел": "мёл",
-            "тел": "тёл",
-            "че": "чё",
-            "чё": "чё",
-            # Дополнительные частые слова
-            "все": "всё",
-            "всего": "всего",  # не ёфицируем
-            "всегда": "всегда",  # не ёфицируем
-            "везде": "везде",  # не ёфицируем
-            "всех": "всех",  # не ёфицируем
-            "всем": "всем",  # не ёфицируем
-            "всеми": "всеми",  # не ёфицируем
-            "всему": "всему",  # не ёфицируем
-            "всей": "всей",  # не ёфицируем
-            "всю": "всю",  # не ёфицируем
-            "всё": "всё",  # уже ёфицировано
-            "цена": "цена"  # не ёфицируем
-        }
-        
-        if word_lower in common_words:
-            return word.replace(word_lower, common_words[word_lower])
+        common = _COMMON_WORDS.get(word_lower)
+        if common is not None:
+            return word.replace(word_lower, common)
         
         # 2. Глаголы прошедшего времени (заканчивающиеся на "ел")
-        if word_lower.endswith("ел") and len(word) > 3:
-            # Расширенный список исключений - глаголы где НЕ нужна буква ё
-            exceptions = [
-                # Общие исключения
-                "медведь", "привет", "удел", "предел", "дела", "как", "гетеро",
-                # Глаголы, которые не меняют "е" на "ё"
-                "хотел", "хотела", "хотели", "хотело",
-                "умел", "умела", "умели", "умело",
-                "смел", "смела", "смели", "смело",
-                "имел", "имела", "имели", "имело",
-                "сел", "села", "сели", "село",
-                "пел", "пела", "пели", "пело",
-                # Глаголы, которые вообще не используют "ё"
-                "смотрел", "смотрела", "смотрели",
-                "думал", "думала", "думали",
-                "знал", "знала", "знали",
-                "был", "была", "были", "было",
-                "жил", "жила", "жили", "жило",
-                "пил", "пила", "пили", "пило",
-                "ел", "ела", "ели", "ело",
-                "спал", "спала", "спали", "спало",
-                "встал", "встала", "встали", "встало",
-                "упал", "упала", "упали", "упало",
-                "взял", "взяла", "взяли", "взяло",
-                "дал", "дала", "дали", "дало",
-                "стал", "стала", "стали", "стало",
-                "читал", "читала", "читали",
-                "писал", "писала", "писали",
-                "рисовал", "рисовала", "рисовали",
-                "играл", "играла", "играли",
-                "работал", "работала", "работали",
-                "учился", "училась", "учились",
-                "гулял", "гуляла", "гуляли",
-                "ходил", "ходила", "ходили",
-                "бегал", "бегала", "бегали",
-                "прыгал", "прыгала", "прыгали",
-                "танцевал", "танцевала", "танцевали",
-                "учил", "учила", "учили",
-                "слушал", "слушала", "слушали",
-                "говорил", "говорила", "говорили",
-                "понимал", "понимала", "понимали",
-                "чувствовал", "чувствовала", "чувствовали",
-                # Дополнительные исключения
-                "летел", "летела", "летели", "летело",
-                "сидел", "сидела", "сидели", "сидело",
-                "лежал", "лежала", "лежали", "лежало",
-                "стоял", "стояла", "стояли", "стояло",
-                "висел", "висела", "висели", "висело",
-                "светел", "светела", "светели", "светело",
-                "темнел", "темнела", "темнели", "темнело",
-                "зеленел", "зеленела", "зеленели", "зеленело",
-                "краснел", "краснела", "краснели", "краснело",
-                "белел", "белела", "белели", "белело",
-                "чернел", "чернела", "чернели", "чернело",
-                "желтел", "желтела", "желтели", "желтело",
-                "синел", "синела", "синели", "синело"
-            ]
-            if word_lower not in exceptions:
-                return word.replace("ел", "ёл")
+        # Расширенный список исключений (_EL_EXCEPTIONS) - глаголы где НЕ нужна буква ё
+        if word_lower.endswith("ел") and len(word) > 3 and word_lower not in _EL_EXCEPTIONS:
+            return word.replace("ел", "ёл")
         
         # 3. Прилагательные женского рода (заканчивающиеся на "ая") - НЕ ёфицируем
         # Все цветовые прилагательные остаются без ё
         
         # 4. Слова с "е" в корне, заканчивающиеся на "а" (женский род)
-        if word_lower.endswith("а") and "е" in word_lower[:-1] and len(word) > 3:
-            exceptions = [
-                "дела", "щелка", "мелка", "желтка", "белка", "зеленка", "краснка", "стена", "ерунда",
-                "река", "лека", "мека", "нека", "века", "сека", "тека", "чека", "шека", "щека",
-                "беда", "неда", "веда", "седа", "теда", "чеда", "шеда", "щеда",
-                "мера", "вера", "сера", "тера", "чера", "шера", "щера",
-                "нега", "вега", "сега", "тега", "чега", "шега", "щега",
-                "меха", "веха", "сеха", "теха", "чеха", "шеха", "щеха",
-                "меча", "веча", "сеча", "теча", "чеча", "шеча", "щеча",
-                "меша", "веша", "сеша", "теша", "чеша", "шеша", "щеша",
-                "меща", "веща", "сеща", "теща", "чеща", "шеща", "щеща",
-                # [START] FIX: Слова, которые НЕ должны ёфицироваться
-                "проверка", "сверка", "переверка", "неверка",
-                # Слова с "ерк" в корне - обычно не ёфицируются (но некоторые могут быть в словаре)
-                "берка", "верка", "дерка", "жерка", "зерка", "перка", "серка", "терка", "черка", "шерка", "щерка"
-            ]
-            if word_lower not in exceptions:
-                # [START] FIX: Исключаем слова с "ерк" в корне (проверка, сверка, и т.д.)
-                if "ерк" in word_lower:
-                    return word
-                # Заменяем "е" на "ё" в корне, но не в окончании
-                return re.sub(r'е([^ё]*а)$', r'ё\1', word)
+        if (
+            word_lower.endswith("а") and "е" in word_lower[:-1] and len(word) > 3
+            and word_lower not in _A_EXCEPTIONS
+        ):
+            # [START] FIX: Исключаем слова с "ерк" в корне (проверка, сверка, и т.д.)
+            if "ерк" in word_lower:
+                return word
+            # Заменяем "е" на "ё" в корне, но не в окончании
+            return _A_ROOT_RE.sub(r'ё\1', word)
         
         # 5. Слова с "е" в корне, заканчивающиеся на "о" (средний род)
-        if word_lower.endswith("о") and "е" in word_lower[:-1] and len(word) > 3:
-            exceptions = [
-                "дело", "место", "время", "небо", "поле", "море", "озеро", "дерево", "гетеро",
-                "честно", "реально", "идеально", "легально", "нормально", "формально",
-                "цена", "веко", "село", "тело", "чело", "шело", "щело",
-                "серо", "теро", "черо", "шеро", "щеро",
-                "него", "вего", "сего", "тего", "чего", "шего", "щего",
-                "мехо", "вехо", "сехо", "техо", "чехо", "шехо", "щехо",
-                "мечо", "вечо", "сечо", "течо", "чечо", "шечо", "щечо",
-                "мешо", "вешо", "сешо", "тешо", "чешо", "шешо", "щешо",
-                "мещо", "вещо", "сещо", "тещо", "чещо", "шещо", "щещо",
-                "мело", "вело", "село", "тело", "чело", "шело", "щело",
-                "медо", "ведо", "седо", "тедо", "чедо", "шедо", "щедо",
-                "меко", "веко", "секо", "теко", "чеко", "шеко", "щеко",
-                "мего", "вего", "сего", "тего", "чего", "шего", "щего",
-                "мехо", "вехо", "сехо", "техо", "чехо", "шехо", "щехо",
-                "мечо", "вечо", "сечо", "течо", "чечо", "шечо", "щечо",
-                "мешо", "вешо", "сешо", "тешо", "чешо", "шешо", "щешо",
-                "мещо", "вещо", "сещо", "тещо", "чещо", "шещо", "щещо"
-            ]
-            if word_lower not in exceptions:
-                # Заменяем "е" на "ё" в корне, но не в окончании
-                return re.sub(r'е([^ё]*о)$', r'ё\1', word)
+        if (
+            word_lower.endswith("о") and "е" in word_lower[:-1] and len(word) > 3
+            and word_lower not in _O_EXCEPTIONS
+        ):
+            # Заменяем "е" на "ё" в корне, но не в окончании
+            return _O_ROOT_RE.sub(r'ё\1', word)
         
         # 6. Слова с "е" в корне, заканчивающиеся на "ый" (мужской род) - НЕ ёфицируем
         # Все цветовые прилагательные остаются без ё
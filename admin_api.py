@@ -1,17 +1,26 @@
 ﻿"""API РґР»СЏ Р°РґРјРёРЅРёСЃС‚СЂРёСЂРѕРІР°РЅРёСЏ TTS Service"""
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Body, Query, Response
+from sqlalchemy import text
 from sqlalchemy.orm import Session
 from database import get_db, Voice as VoiceModel
-from tts_engine import tts_engine_manager
+from tts_engine import BUSY_RETRY_AFTER, tts_engine_manager
+from TTS_rus_engine.russian_tts import invalidate_voice_references
 from file_manager import file_manager
 from background_tasks import background_task_manager
 from stats_service import stats_service
+from async_audio_converter import AsyncAudioConverter
+from config import config
 from auth import get_admin_user
 from monitoring import tts_monitor
+from api_endpoints_voice_enabled import invalidate_active_voice_ids
+from upload_utils import has_valid_audio_signature, spool_upload, staging_path
+import asyncio
 import logging
 import os
+import threading
+import time
 from pathlib import Path
-from typing import Dict, Any
+from typing import Any
 import re
 logger = logging.getLogger(__name__)
 admin_router = APIRouter(tags=['admin'], dependencies=[Depends(get_admin_user)])
@@ -25,36 +34,48 @@ def _set_legacy_deprecation_headers(response: Response) -> None:
 
 def _sanitize_voice_name(raw_name: str) -> str:
     normalized = (raw_name or '').strip()
-    if not VOICE_NAME_RE.fullmatch(normalized):
+    if not 0 < len(normalized) <= 80 or not VOICE_NAME_RE.fullmatch(normalized):
         raise HTTPException(status_code=400, detail='Invalid voice name')
     return normalized
 
-def _has_valid_audio_signature(file_path: str) -> bool:
-    """Best-effort magic header validation for common audio containers/codecs."""
-    try:
-        with open(file_path, 'rb') as source:
-            header = source.read(16)
-    except OSError:
-        return False
-    if len(header) < 4:
-        return False
-    if header.startswith(b'RIFF') and len(header) >= 12 and (header[8:12] == b'WAVE'):
-        return True
-    if header.startswith(b'ID3') or (header[0] == 255 and header[1] & 224 == 224):
-        return True
-    if header.startswith(b'OggS'):
-        return True
-    if header.startswith(b'fLaC'):
-        return True
-    if len(header) >= 12 and header[4:8] == b'ftyp':
-        return True
-    if header.startswith(bytes.fromhex('3026B2758E66CF11')):
-        return True
-    if header.startswith(b'FORM') and len(header) >= 12 and (header[8:12] in {b'AIFF', b'AIFC'}):
-        return True
-    if header.startswith(b'.snd'):
-        return True
-    return False
+VOICE_LOOKUP_TTL = 30.0
+VOICE_LOOKUP_MAXSIZE = 256
+_voice_lookup_cache: dict[str, Any] = {}
+_voice_lookup_lock = threading.Lock()
+
+def invalidate_voice_lookup() -> None:
+    """Drop cached voice lookups, active voice ids and synthesis voice references; call after any voice create/rename/delete/update."""
+    with _voice_lookup_lock:
+        _voice_lookup_cache.clear()
+    invalidate_active_voice_ids()
+    invalidate_voice_references()
+
+def _relax_commit_durability(db: Session) -> None:
+    """Skip the WAL flush wait for this transaction only (non-critical metadata writes)."""
+    if db.get_bind().dialect.name == 'postgresql':
+        db.execute(text('SET LOCAL synchronous_commit = off'))
+
+def _voice_name_taken(db: Session, voice_name: str, exclude_id: int | None=None) -> bool:
+    """Name conflict check against the unique index on voices.name, fetching only the id."""
+    query = db.query(VoiceModel.id).filter(VoiceModel.name == voice_name)
+    if exclude_id is not None:
+        query = query.filter(VoiceModel.id != exclude_id)
+    return query.first() is not None
+
+def _lookup_voice_for_test(db: Session, voice_name: str):
+    """Short-lived cache of the columns test_voice needs, keyed by voice name."""
+    now = time.monotonic()
+    cached = _voice_lookup_cache.get(voice_name)
+    if cached and cached[0] > now:
+        return cached[1]
+    voice = db.query(VoiceModel.id, VoiceModel.owner_id, VoiceModel.cfg_strength, VoiceModel.speed_preset).filter(VoiceModel.name == voice_name).first()
+    if voice is None:
+        return None
+    with _voice_lookup_lock:
+        if voice_name not in _voice_lookup_cache and len(_voice_lookup_cache) >= VOICE_LOOKUP_MAXSIZE:
+            _voice_lookup_cache.pop(next(iter(_voice_lookup_cache)), None)
+        _voice_lookup_cache[voice_name] = (now + VOICE_LOOKUP_TTL, voice)
+    return voice
 
 @admin_router.get('/stats')
 async def get_admin_stats(db: Session=Depends(get_db)):
@@ -90,8 +111,10 @@ async def toggle_voice(voice_id: int, db: Session=Depends(get_db)):
         voice = db.query(VoiceModel).filter(VoiceModel.id == voice_id).first()
         if not voice:
             raise HTTPException(status_code=404, detail='Voice not found')
+        _relax_commit_durability(db)
         voice.is_active = not voice.is_active
         db.commit()
+        invalidate_voice_lookup()
         return {'status': 'success', 'message': f"Voice {voice.name} {('enabled' if voice.is_active else 'disabled')}", 'voice': {'id': voice.id, 'name': voice.name, 'is_active': voice.is_active}}
     except HTTPException:
         raise
@@ -100,62 +123,81 @@ async def toggle_voice(voice_id: int, db: Session=Depends(get_db)):
         db.rollback()
         raise HTTPException(status_code=500, detail='Internal server error')
 
+@admin_router.post('/voices/bulk_toggle')
+async def bulk_toggle_voices(payload: dict=Body(...), db: Session=Depends(get_db)):
+    """Enable/disable several voices in a single UPDATE and commit"""
+    try:
+        ids = payload.get('ids')
+        is_active = payload.get('is_active')
+        if not isinstance(ids, list) or not all((isinstance(i, int) for i in ids)) or not isinstance(is_active, bool):
+            raise HTTPException(status_code=400, detail='ids (list of int) and is_active (bool) are required')
+        if not ids:
+            return {'status': 'success', 'updated': 0}
+        known = {voice_id for (voice_id,) in db.query(VoiceModel.id).filter(VoiceModel.id.in_(ids))}
+        missing = sorted(set(ids) - known)
+        if missing:
+            raise HTTPException(status_code=404, detail=f'Voices not found: {missing}')
+        _relax_commit_durability(db)
+        updated = db.query(VoiceModel).filter(VoiceModel.id.in_(ids)).update({VoiceModel.is_active: is_active}, synchronize_session=False)
+        db.commit()
+        invalidate_voice_lookup()
+        return {'status': 'success', 'updated': updated, 'is_active': is_active}
+    except HTTPException:
+        raise
+    except Exception:
+        logger.exception('Bulk toggle voices error')
+        db.rollback()
+        raise HTTPException(status_code=500, detail='Internal server error')
+
 @admin_router.post('/voices/upload')
-async def upload_voice(file: UploadFile=File(...), name: str=None, db: Session=Depends(get_db), current_user: Dict[str, Any]=Depends(get_admin_user)):
+async def upload_voice(file: UploadFile=File(...), name: str=None, db: Session=Depends(get_db), current_user: dict[str, Any]=Depends(get_admin_user)):
     """Р—Р°РіСЂСѓР·РёС‚СЊ РЅРѕРІС‹Р№ РіРѕР»РѕСЃ РґР»СЏ AI TTS СЃ Р°РІС‚РѕРјР°С‚РёС‡РµСЃРєРѕР№ РєРѕРЅРІРµСЂС‚Р°С†РёРµР№ Рё С‚СЂР°РЅСЃРєСЂРёР±Р°С†РёРµР№"""
-    import tempfile
     temp_input_path = None
-    temp_converted_path = None
-    final_voice_path = None
+    staged_voice_path = None
     try:
         allowed_extensions = ['.wav', '.mp3', '.ogg', '.flac', '.m4a', '.aac', '.wma', '.aiff', '.au']
         file_extension = os.path.splitext(file.filename)[1].lower()
         if file_extension not in allowed_extensions:
             raise HTTPException(status_code=400, detail=f"РќРµРїРѕРґРґРµСЂР¶РёРІР°РµРјС‹Р№ С„РѕСЂРјР°С‚ С„Р°Р№Р»Р°. Р Р°Р·СЂРµС€РµРЅС‹: {', '.join(allowed_extensions)}")
         voice_name = _sanitize_voice_name(name or os.path.splitext(file.filename)[0])
-        existing_voice = db.query(VoiceModel).filter(VoiceModel.name == voice_name).first()
-        if existing_voice:
+        if _voice_name_taken(db, voice_name):
             raise HTTPException(status_code=400, detail=f"Р“РѕР»РѕСЃ СЃ РёРјРµРЅРµРј '{voice_name}' СѓР¶Рµ СЃСѓС‰РµСЃС‚РІСѓРµС‚")
-        with tempfile.NamedTemporaryFile(delete=False, suffix=file_extension) as temp_file:
-            contents = await file.read()
-            temp_file.write(contents)
-            temp_input_path = temp_file.name
-        if not _has_valid_audio_signature(temp_input_path):
+        temp_input_path = await asyncio.get_event_loop().run_in_executor(None, spool_upload, file.file, file_extension)
+        if not has_valid_audio_signature(temp_input_path):
             raise HTTPException(status_code=400, detail='Invalid audio file signature')
         logger.info(f'[RECEIVE] Voice file uploaded to temp: {temp_input_path}')
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.wav') as temp_converted_file:
-            temp_converted_path = temp_converted_file.name
-        from async_audio_converter import AsyncAudioConverter
+        voices_dir = Path('audio/voices/global')
+        voices_dir.mkdir(parents=True, exist_ok=True)
+        safe_filename = f'{voice_name}.wav'
+        final_voice_path = voices_dir / safe_filename
+        # Convert next to the final file and move it into place only once the DB row is committed,
+        # so a concurrent upload of the same name that loses the race never touches the winner's file.
+        staged_voice_path = staging_path(final_voice_path)
         converter = AsyncAudioConverter(max_workers=1)
         await converter.start_workers()
         try:
-            success = converter._convert_audio_sync(temp_input_path, temp_converted_path, 'upload_task')
+            success = converter._convert_audio_sync(temp_input_path, str(staged_voice_path), 'upload_task')
             if not success:
                 raise Exception('Audio conversion failed')
-            logger.info(f'[OK] Audio converted to WAV: {temp_converted_path}')
+            logger.info(f'[OK] Audio converted to WAV: {staged_voice_path}')
         finally:
             await converter.stop_workers()
         reference_text = ''
         try:
-            from tts_engine import tts_engine_manager
             if tts_engine_manager.transcriber:
-                reference_text = tts_engine_manager.transcribe(temp_converted_path)
+                reference_text = await tts_engine_manager.transcribe_cached_async(str(staged_voice_path))
                 logger.info(f"[OK] Audio transcribed: '{reference_text[:50]}...'")
             else:
                 logger.warning('[WARN] Transcriber not available, skipping transcription')
         except Exception:
             logger.exception('[WARN] Transcription failed, continuing without reference text')
-        voices_dir = Path('audio/voices/global')
-        voices_dir.mkdir(parents=True, exist_ok=True)
-        safe_filename = f'{voice_name}.wav'
-        final_voice_path = voices_dir / safe_filename
-        import shutil
-        shutil.copy2(temp_converted_path, final_voice_path)
-        logger.info(f'[OK] Voice saved: {final_voice_path}')
-        from config import config
         new_voice = VoiceModel(name=voice_name, voice_type='global', file_path=str(final_voice_path), reference_text=reference_text or None, is_active=True, is_global=True, owner_id=None, cfg_strength=config.cfg_strength, speed_preset='normal')
         db.add(new_voice)
         db.commit()
+        os.replace(staged_voice_path, final_voice_path)
+        staged_voice_path = None
+        logger.info(f'[OK] Voice saved: {final_voice_path}')
+        invalidate_voice_lookup()
         db.refresh(new_voice)
         logger.info(f"[OK] Global voice '{voice_name}' uploaded successfully by admin user {current_user.get('user_id')} (Voice ID: {new_voice.id})")
         return {'status': 'success', 'message': f"Р“РѕР»РѕСЃ '{voice_name}' СѓСЃРїРµС€РЅРѕ Р·Р°РіСЂСѓР¶РµРЅ, РєРѕРЅРІРµСЂС‚РёСЂРѕРІР°РЅ РІ WAV Рё С‚СЂР°РЅСЃРєСЂРёР±РёСЂРѕРІР°РЅ", 'voice': {'id': new_voice.id, 'name': new_voice.name, 'voice_type': new_voice.voice_type, 'is_active': new_voice.is_active, 'file_path': str(final_voice_path), 'reference_text': reference_text[:100] + '...' if reference_text and len(reference_text) > 100 else reference_text, 'format': 'WAV 48kHz Mono 16-bit'}}
@@ -164,20 +206,14 @@ async def upload_voice(file: UploadFile=File(...), name: str=None, db: Session=D
     except Exception:
         logger.exception('Voice upload error')
         db.rollback()
-        if final_voice_path and Path(final_voice_path).exists():
-            Path(final_voice_path).unlink()
         raise HTTPException(status_code=500, detail='Internal server error')
     finally:
-        if temp_input_path and os.path.exists(temp_input_path):
-            try:
-                os.unlink(temp_input_path)
-            except OSError:
-                pass
-        if temp_converted_path and os.path.exists(temp_converted_path):
-            try:
-                os.unlink(temp_converted_path)
-            except OSError:
-                pass
+        for leftover_path in (temp_input_path, staged_voice_path):
+            if leftover_path:
+                try:
+                    os.unlink(leftover_path)
+                except OSError:
+                    pass
 
 @admin_router.post('/voices/{voice_id}/retranscribe')
 async def retranscribe_voice(voice_id: int, db: Session=Depends(get_db)):
@@ -186,22 +222,24 @@ async def retranscribe_voice(voice_id: int, db: Session=Depends(get_db)):
         voice = db.query(VoiceModel).filter(VoiceModel.id == voice_id).first()
         if not voice:
             raise HTTPException(status_code=404, detail='Р“РѕР»РѕСЃ РЅРµ РЅР°Р№РґРµРЅ')
-        if not voice.file_path or not os.path.exists(voice.file_path):
+        if not voice.file_path:
             raise HTTPException(status_code=404, detail='РђСѓРґРёРѕС„Р°Р№Р» РЅРµ РЅР°Р№РґРµРЅ')
         logger.info(f'[REFRESH] Starting retranscription for voice {voice_id} ({voice.name})')
         reference_text = ''
         try:
-            from tts_engine import tts_engine_manager
             if tts_engine_manager.transcriber:
-                reference_text = tts_engine_manager.transcribe(voice.file_path)
+                reference_text = await tts_engine_manager.transcribe_async(voice.file_path)
                 logger.info(f"[OK] Retranscribed: '{reference_text[:50]}...'")
             else:
                 raise Exception('Transcriber not available')
+        except FileNotFoundError:
+            raise HTTPException(status_code=404, detail='РђСѓРґРёРѕС„Р°Р№Р» РЅРµ РЅР°Р№РґРµРЅ')
         except Exception:
             logger.exception('[ERROR] Transcription failed')
             raise HTTPException(status_code=500, detail='Internal server error')
         voice.reference_text = reference_text
         db.commit()
+        invalidate_voice_lookup()
         db.refresh(voice)
         logger.info(f'[OK] Voice {voice_id} retranscribed successfully')
         return {'status': 'success', 'message': f"Р“РѕР»РѕСЃ '{voice.name}' СѓСЃРїРµС€РЅРѕ РїРµСЂРµС‚СЂР°РЅСЃРєСЂРёР±РёСЂРѕРІР°РЅ", 'reference_text': reference_text, 'voice_id': voice_id}
@@ -214,11 +252,10 @@ async def retranscribe_voice(voice_id: int, db: Session=Depends(get_db)):
 @admin_router.post('/voices/test')
 async def test_voice(voice_name: str=Form(...), user_id: int=Form(...), test_text: str=Form(...), cfg_strength: float=Form(None), speed_preset: str=Form(None), db: Session=Depends(get_db)):
     """РўРµСЃС‚РёСЂРѕРІР°С‚СЊ РіРѕР»РѕСЃ СЃ Р·Р°РґР°РЅРЅС‹Рј С‚РµРєСЃС‚РѕРј Рё РЅР°СЃС‚СЂРѕР№РєР°РјРё"""
-    from pathlib import Path
     try:
         if not voice_name or not test_text:
             raise HTTPException(status_code=400, detail='voice_name and test_text are required')
-        voice = db.query(VoiceModel).filter(VoiceModel.name == voice_name).first()
+        voice = _lookup_voice_for_test(db, voice_name)
         if not voice:
             raise HTTPException(status_code=404, detail=f"Voice '{voice_name}' not found")
         if voice.owner_id and user_id and (voice.owner_id != user_id):
@@ -227,6 +264,8 @@ async def test_voice(voice_name: str=Form(...), user_id: int=Form(...), test_tex
         cfg = cfg_strength if cfg_strength is not None else voice.cfg_strength
         speed = speed_preset if speed_preset is not None else voice.speed_preset
         result = await tts_engine_manager.synthesize_speech_async(text=test_text, voice=voice_name, user_id=user_id, channel_name='test', author='admin', volume=50.0, tts_settings={'voice_settings': {'cfg_strength': cfg, 'speed_preset': speed}})
+        if result.get('busy'):
+            raise HTTPException(status_code=429, detail='TTS engine busy', headers={'Retry-After': str(BUSY_RETRY_AFTER)})
         if not result.get('success'):
             raise HTTPException(status_code=500, detail='Synthesis failed')
         audio_url = result.get('audio_url')
@@ -235,10 +274,9 @@ async def test_voice(voice_name: str=Form(...), user_id: int=Form(...), test_tex
             logger.info(f'[OK] Test synthesis completed: {audio_url}')
             return {'status': 'success', 'audio_url': audio_url, 'message': 'Test synthesis completed successfully'}
         if audio_path:
-            from config import config
             audio_path_obj = Path(audio_path)
             try:
-                abs_audio_path = config.audio_path.resolve()
+                abs_audio_path = config.resolved_audio_path
                 abs_audio_file = audio_path_obj.resolve()
                 try:
                     relative_path = abs_audio_file.relative_to(abs_audio_path)
@@ -265,14 +303,17 @@ async def delete_legacy_voice(voice_id: int, response: Response, db: Session=Dep
         voice = db.query(VoiceModel).filter(VoiceModel.id == voice_id).first()
         if not voice:
             raise HTTPException(status_code=404, detail='Voice not found')
-        if voice.file_path and Path(voice.file_path).exists():
+        if voice.file_path:
             try:
-                Path(voice.file_path).unlink()
+                os.unlink(voice.file_path)
                 logger.info(f'Voice file deleted: {voice.file_path}')
-            except Exception:
+            except FileNotFoundError:
+                pass
+            except OSError:
                 logger.exception('Failed to delete voice file')
         db.delete(voice)
         db.commit()
+        invalidate_voice_lookup()
         logger.info(f"Voice '{voice.name}' (ID: {voice_id}) deleted successfully")
         return {'status': 'success', 'message': f"Р“РѕР»РѕСЃ '{voice.name}' СѓСЃРїРµС€РЅРѕ СѓРґР°Р»С‘РЅ"}
     except HTTPException:
@@ -297,6 +338,7 @@ async def update_legacy_voice_settings(voice_id: int, response: Response, settin
         if 'speed_preset' in settings:
             voice.speed_preset = settings['speed_preset']
         db.commit()
+        invalidate_voice_lookup()
         db.refresh(voice)
         logger.info(f'[OK] Voice {voice_id} settings updated')
         return {'status': 'success', 'message': 'РќР°СЃС‚СЂРѕР№РєРё РіРѕР»РѕСЃР° РѕР±РЅРѕРІР»РµРЅС‹', 'voice': {'id': voice.id, 'name': voice.name, 'reference_text': voice.reference_text, 'cfg_strength': voice.cfg_strength, 'speed_preset': voice.speed_preset}}
@@ -316,12 +358,12 @@ async def rename_legacy_voice(voice_id: int, response: Response, new_name: str=Q
         if not voice:
             raise HTTPException(status_code=404, detail='Voice not found')
         sanitized_new_name = _sanitize_voice_name(new_name)
-        existing_voice = db.query(VoiceModel).filter(VoiceModel.name == sanitized_new_name, VoiceModel.id != voice_id).first()
-        if existing_voice:
+        if _voice_name_taken(db, sanitized_new_name, exclude_id=voice_id):
             raise HTTPException(status_code=400, detail=f"Р“РѕР»РѕСЃ СЃ РёРјРµРЅРµРј '{sanitized_new_name}' СѓР¶Рµ СЃСѓС‰РµСЃС‚РІСѓРµС‚")
         old_name = voice.name
         voice.name = sanitized_new_name
         db.commit()
+        invalidate_voice_lookup()
         logger.info(f"Voice renamed from '{old_name}' to '{sanitized_new_name}' (ID: {voice_id})")
         return {'status': 'success', 'message': f"Р“РѕР»РѕСЃ РїРµСЂРµРёРјРµРЅРѕРІР°РЅ: '{old_name}' в†’ '{sanitized_new_name}'", 'voice': {'id': voice.id, 'name': voice.name}}
     except HTTPException:
@@ -351,7 +393,7 @@ async def restart_system():
         raise HTTPException(status_code=500, detail='Internal server error')
 
 @admin_router.put('/voices/{voice_id}/settings')
-async def update_voice_settings(voice_id: int, settings: dict, current_user: Dict[str, Any]=Depends(get_admin_user), db: Session=Depends(get_db)):
+async def update_voice_settings(voice_id: int, settings: dict, current_user: dict[str, Any]=Depends(get_admin_user), db: Session=Depends(get_db)):
     """Update settings for a voice (admin only)"""
     try:
         voice = db.query(VoiceModel).filter(VoiceModel.id == voice_id).first()
@@ -364,6 +406,7 @@ async def update_voice_settings(voice_id: int, settings: dict, current_user: Dic
         if 'reference_text' in settings:
             voice.reference_text = settings['reference_text']
         db.commit()
+        invalidate_voice_lookup()
         db.refresh(voice)
         logger.info(f'[OK] Admin updated voice {voice_id} settings')
         return {'success': True, 'message': 'Voice settings updated', 'settings': {'cfg_strength': voice.cfg_strength, 'speed_preset': voice.speed_preset, 'reference_text': voice.reference_text}}
@@ -375,20 +418,23 @@ async def update_voice_settings(voice_id: int, settings: dict, current_user: Dic
         raise HTTPException(status_code=500, detail='Internal server error')
 
 @admin_router.delete('/voices/{voice_id}')
-async def delete_voice(voice_id: int, current_user: Dict[str, Any]=Depends(get_admin_user), db: Session=Depends(get_db)):
+async def delete_voice(voice_id: int, current_user: dict[str, Any]=Depends(get_admin_user), db: Session=Depends(get_db)):
     """Delete a voice (admin only)"""
     try:
         voice = db.query(VoiceModel).filter(VoiceModel.id == voice_id).first()
         if not voice:
             raise HTTPException(status_code=404, detail='Voice not found')
-        if voice.file_path and os.path.exists(voice.file_path):
+        if voice.file_path:
             try:
-                os.remove(voice.file_path)
+                os.unlink(voice.file_path)
                 logger.info(f'[OK] Deleted voice file: {voice.file_path}')
-            except Exception:
+            except FileNotFoundError:
+                pass
+            except OSError:
                 logger.exception('[WARN] Failed to delete voice file')
         db.delete(voice)
         db.commit()
+        invalidate_voice_lookup()
         logger.info(f'[OK] Admin deleted voice {voice_id}')
         return {'success': True, 'message': 'Voice deleted successfully'}
     except HTTPException:
@@ -399,19 +445,19 @@ async def delete_voice(voice_id: int, current_user: Dict[str, Any]=Depends(get_a
         raise HTTPException(status_code=500, detail='Internal server error')
 
 @admin_router.put('/voices/{voice_id}/rename')
-async def rename_voice_endpoint(voice_id: int, new_name: str, current_user: Dict[str, Any]=Depends(get_admin_user), db: Session=Depends(get_db)):
+async def rename_voice_endpoint(voice_id: int, new_name: str, current_user: dict[str, Any]=Depends(get_admin_user), db: Session=Depends(get_db)):
     """Rename a voice (admin only)"""
     try:
         voice = db.query(VoiceModel).filter(VoiceModel.id == voice_id).first()
         if not voice:
             raise HTTPException(status_code=404, detail='Voice not found')
         sanitized_new_name = _sanitize_voice_name(new_name)
-        existing_voice = db.query(VoiceModel).filter(VoiceModel.name == sanitized_new_name, VoiceModel.id != voice_id).first()
-        if existing_voice:
+        if _voice_name_taken(db, sanitized_new_name, exclude_id=voice_id):
             raise HTTPException(status_code=400, detail=f"Voice with name '{sanitized_new_name}' already exists")
         old_name = voice.name
         voice.name = sanitized_new_name
         db.commit()
+        invalidate_voice_lookup()
         logger.info(f"[OK] Admin renamed voice {voice_id} from '{old_name}' to '{sanitized_new_name}'")
         return {'success': True, 'message': f"Voice renamed from '{old_name}' to '{sanitized_new_name}'", 'new_name': sanitized_new_name}
     except HTTPException:
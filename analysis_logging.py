@@ -5,15 +5,24 @@ Analysis Logging for LLM Feature Verification
 JSONL format optimized for LLM parsing during testing sessions.
 Enable with environment variable: ANALYSIS_MODE=true
 """
+import atexit
+import copy
 import json
 import logging
 import logging.handlers
 import os
-import uuid
+import queue
+import secrets
+from contextlib import contextmanager
 from contextvars import ContextVar
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Optional
+from typing import Optional
+
+try:
+    import orjson
+except ImportError:  # optional: fall back to stdlib json
+    orjson = None
 
 # Correlation ID for request tracing
 _correlation_id: ContextVar[str] = ContextVar('correlation_id', default='')
@@ -23,7 +32,7 @@ def get_correlation_id() -> str:
     """Get current correlation ID or generate new one"""
     cid = _correlation_id.get()
     if not cid:
-        cid = str(uuid.uuid4())[:8]
+        cid = secrets.token_hex(4)
         _correlation_id.set(cid)
     return cid
 
@@ -31,7 +40,7 @@ def get_correlation_id() -> str:
 def set_correlation_id(cid: str = None) -> str:
     """Set correlation ID for current context"""
     if cid is None:
-        cid = str(uuid.uuid4())[:8]
+        cid = secrets.token_hex(4)
     _correlation_id.set(cid)
     return cid
 
@@ -41,39 +50,85 @@ def clear_correlation_id():
     _correlation_id.set('')
 
 
+@contextmanager
+def correlation_scope(cid: str | None = None):
+    """Bind a correlation ID for the duration of the block and restore the previous one after"""
+    token = _correlation_id.set(cid or secrets.token_hex(4))
+    try:
+        yield
+    finally:
+        _correlation_id.reset(token)
+
+
+class CorrelationIdMiddleware:
+    """Pure ASGI middleware: one correlation ID per HTTP request, so later lookups are plain reads"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+        with correlation_scope():
+            await self.app(scope, receive, send)
+
+
+# LogRecord attributes (set via `extra=`) copied into the JSON line, as (record attr, output key)
+_EXTRA_KEYS = (
+    ('feature', 'feature'),
+    ('action', 'action'),
+    ('success', 'success'),
+    ('duration_ms', 'duration_ms'),
+    ('user_id', 'user_id'),
+    ('extra_data', 'data'),
+)
+
+
 class JSONLFormatter(logging.Formatter):
     """Format log records as JSON Lines"""
     
     def format(self, record: logging.LogRecord) -> str:
         log_data = {
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": datetime.fromtimestamp(record.created),
             "level": record.levelname,
-            "correlation_id": get_correlation_id(),
+            "correlation_id": getattr(record, 'correlation_id', None) or get_correlation_id(),
             "logger": record.name,
             "message": record.getMessage(),
         }
         
         # Add extra fields from record
-        if hasattr(record, 'feature'):
-            log_data['feature'] = record.feature
-        if hasattr(record, 'action'):
-            log_data['action'] = record.action
-        if hasattr(record, 'success'):
-            log_data['success'] = record.success
-        if hasattr(record, 'duration_ms'):
-            log_data['duration_ms'] = record.duration_ms
-        if hasattr(record, 'user_id'):
-            log_data['user_id'] = record.user_id
-        if hasattr(record, 'extra_data'):
-            log_data['data'] = record.extra_data
+        record_dict = record.__dict__
+        for src, dst in _EXTRA_KEYS:
+            if src in record_dict:
+                log_data[dst] = record_dict[src]
         
         # Add exception info if present
         if record.exc_info:
             log_data['exception'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            log_data['exception'] = record.exc_text
         
+        if orjson is not None:
+            return orjson.dumps(log_data, default=str, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+        log_data['timestamp'] = log_data['timestamp'].isoformat()
         return json.dumps(log_data, ensure_ascii=False, default=str)
 
 
+class _ContextQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that snapshots caller context before the record leaves the request thread"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.correlation_id = get_correlation_id()
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
 class AnalysisLogger:
     """Logger for LLM analysis of feature correctness"""
     
@@ -93,6 +148,7 @@ class AnalysisLogger:
         self.logger = logging.getLogger('f5_tts.analysis')
         self.logger.setLevel(logging.DEBUG)
         self.logger.propagate = False  # Don't send to parent loggers
+        self._listener: logging.handlers.QueueListener | None = None
         
         if self.enabled:
             self._setup_handlers()
@@ -118,16 +174,22 @@ class AnalysisLogger:
         handler.setFormatter(JSONLFormatter())
         handler.setLevel(logging.DEBUG)
         
-        self.logger.handlers.clear()
-        self.logger.addHandler(handler)
-        
         # Also log to console in debug format
         console = logging.StreamHandler()
         console.setLevel(logging.INFO)
         console.setFormatter(logging.Formatter(
             '[ANALYSIS] %(asctime)s - %(message)s'
         ))
-        self.logger.addHandler(console)
+        
+        # Callers only enqueue; disk and console writes happen on the listener thread
+        log_queue: queue.Queue = queue.Queue(-1)
+        self.logger.handlers.clear()
+        self.logger.addHandler(_ContextQueueHandler(log_queue))
+        self._listener = logging.handlers.QueueListener(
+            log_queue, handler, console, respect_handler_level=True
+        )
+        self._listener.start()
+        atexit.register(self._listener.stop)
         
         self.logger.info("Analysis logging initialized", extra={
             'feature': 'system',
@@ -166,7 +228,7 @@ class AnalysisLogger:
 
 
 # Global instance
-_analysis_logger: Optional[AnalysisLogger] = None
+_analysis_logger: AnalysisLogger | None = None
 
 
 def get_analysis_logger() -> AnalysisLogger:
@@ -178,6 +240,8 @@ def get_analysis_logger() -> AnalysisLogger:
 
 
 # ============ TTS-Specific Convenience Functions ============
+# Each helper checks `enabled` first so that, with ANALYSIS_MODE off, no message
+# formatting or payload construction happens on the caller's hot path.
 
 def log_feature(
     feature: str,
@@ -189,6 +253,8 @@ def log_feature(
     **extra
 ):
     """Log a generic feature event"""
+    if not get_analysis_logger().enabled:
+        return
     get_analysis_logger().log(
         feature=feature,
         action=action,
@@ -211,6 +277,8 @@ def log_tts_generation(
     error: str = None
 ):
     """Log TTS generation event"""
+    if not get_analysis_logger().enabled:
+        return
     log_feature(
         feature='tts_generation',
         action='generate',
@@ -237,6 +305,8 @@ def log_audio_conversion(
     error: str = None
 ):
     """Log audio conversion event"""
+    if not get_analysis_logger().enabled:
+        return
     log_feature(
         feature='audio_conversion',
         action='convert',
@@ -259,6 +329,8 @@ def log_voice_selection(
     success: bool = True
 ):
     """Log voice pool selection event"""
+    if not get_analysis_logger().enabled:
+        return
     log_feature(
         feature='voice_selection',
         action='select',
@@ -280,6 +352,8 @@ def log_rate_limit(
     success: bool = True
 ):
     """Log rate limiting event"""
+    if not get_analysis_logger().enabled:
+        return
     log_feature(
         feature='rate_limit',
         action=action,
@@ -302,6 +376,8 @@ def log_gpu_worker(
     error: str = None
 ):
     """Log GPU worker status"""
+    if not get_analysis_logger().enabled:
+        return
     log_feature(
         feature='gpu_worker',
         action=action,
@@ -325,6 +401,8 @@ def log_api_request(
     response_size: int = None
 ):
     """Log API request"""
+    if not get_analysis_logger().enabled:
+        return
     success = 200 <= status_code < 400
     log_feature(
         feature='api_request',
@@ -348,6 +426,8 @@ def log_error(
     **extra
 ):
     """Log an error for analysis"""
+    if not get_analysis_logger().enabled:
+        return
     get_analysis_logger().log(
         feature=feature,
         action='error',
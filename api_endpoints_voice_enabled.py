@@ -1,5 +1,6 @@
-﻿from typing import Any, Dict, List
+﻿from typing import Any
 import logging
+import time
 
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
@@ -11,9 +12,38 @@ logger = logging.getLogger(__name__)
 
 voice_enabled_router = APIRouter(prefix="/user/voices/enabled", tags=["voice-enabled"])
 
+ACTIVE_VOICE_IDS_TTL = 30.0
+_active_voice_ids_cache: tuple[float, frozenset[int]] = (0.0, frozenset())
 
-def _ensure_user_access(current_user: Dict[str, Any], target_user_id: int) -> None:
-    actor_user_id = current_user.get("user_id", current_user.get("id"))
+
+def invalidate_active_voice_ids() -> None:
+    """Drop the cached active voice id set (call after voice create/delete/toggle)."""
+    global _active_voice_ids_cache
+    _active_voice_ids_cache = (0.0, frozenset())
+
+
+def _fresh_active_voice_ids(db: Session) -> frozenset[int]:
+    """Query the active voice id set and refresh this process's cache with it."""
+    global _active_voice_ids_cache
+    voice_ids = frozenset(row[0] for row in db.query(VoiceModel.id).filter(VoiceModel.is_active.is_(True)).all())
+    _active_voice_ids_cache = (time.monotonic(), voice_ids)
+    return voice_ids
+
+
+def _active_voice_ids(db: Session) -> frozenset[int]:
+    """Cached active voice ids for read-only listings.
+
+    invalidate_active_voice_ids() only reaches the current process, so other workers may
+    serve a set up to ACTIVE_VOICE_IDS_TTL seconds old; write paths validate against the DB.
+    """
+    cached_at, voice_ids = _active_voice_ids_cache
+    if cached_at and time.monotonic() - cached_at < ACTIVE_VOICE_IDS_TTL:
+        return voice_ids
+    return _fresh_active_voice_ids(db)
+
+
+def _ensure_user_access(current_user: dict[str, Any], target_user_id: int) -> None:
+    actor_user_id = current_user.get("user_id")
     if current_user.get("is_admin"):
         return
     if not isinstance(actor_user_id, int) or actor_user_id != target_user_id:
@@ -24,27 +54,26 @@ def _ensure_user_access(current_user: Dict[str, Any], target_user_id: int) -> No
 async def get_user_enabled_voices(
     user_id: int,
     db: Session = Depends(get_db),
-    current_user: Dict[str, Any] = Depends(get_current_user_or_internal),
+    current_user: dict[str, Any] = Depends(get_current_user_or_internal),
 ):
     """Return enabled voice IDs for the user."""
     try:
         _ensure_user_access(current_user, user_id)
 
-        enabled_records = db.query(UserVoiceEnabled).filter(
+        enabled_records = db.query(UserVoiceEnabled.voice_id).filter(
             UserVoiceEnabled.user_id == user_id,
             UserVoiceEnabled.is_enabled.is_(True),
         ).all()
 
         if not enabled_records:
-            all_voices = db.query(VoiceModel).filter(VoiceModel.is_active.is_(True)).all()
-            enabled_voice_ids = [voice.id for voice in all_voices]
+            enabled_voice_ids = sorted(_active_voice_ids(db))
             logger.info(
                 "No enabled voices for user %s, returning all active voices (%s)",
                 user_id,
                 len(enabled_voice_ids),
             )
         else:
-            enabled_voice_ids = [record.voice_id for record in enabled_records]
+            enabled_voice_ids = [row[0] for row in enabled_records]
             logger.info("Found %s enabled voices for user %s", len(enabled_voice_ids), user_id)
 
         return {"success": True, "enabled_voice_ids": enabled_voice_ids}
@@ -58,16 +87,15 @@ async def get_user_enabled_voices(
 @voice_enabled_router.post("/{user_id}")
 async def update_user_enabled_voices(
     user_id: int,
-    voice_ids: List[int],
+    voice_ids: list[int],
     db: Session = Depends(get_db),
-    current_user: Dict[str, Any] = Depends(get_current_user_or_internal),
+    current_user: dict[str, Any] = Depends(get_current_user_or_internal),
 ):
     """Replace enabled voices list for the user."""
     try:
         _ensure_user_access(current_user, user_id)
 
-        all_voices = db.query(VoiceModel).filter(VoiceModel.is_active.is_(True)).all()
-        all_voice_ids = {voice.id for voice in all_voices}
+        all_voice_ids = _fresh_active_voice_ids(db)
         provided_voice_ids = set(voice_ids)
 
         invalid_ids = provided_voice_ids - all_voice_ids
@@ -76,14 +104,12 @@ async def update_user_enabled_voices(
 
         db.query(UserVoiceEnabled).filter(UserVoiceEnabled.user_id == user_id).delete()
 
-        for voice_id in all_voice_ids:
-            db.add(
-                UserVoiceEnabled(
-                    user_id=user_id,
-                    voice_id=voice_id,
-                    is_enabled=voice_id in provided_voice_ids,
-                )
-            )
+        rows = [
+            {"user_id": user_id, "voice_id": voice_id, "is_enabled": voice_id in provided_voice_ids}
+            for voice_id in all_voice_ids
+        ]
+        if rows:
+            db.bulk_insert_mappings(UserVoiceEnabled, rows)
 
         db.commit()
         logger.info(
@@ -110,17 +136,17 @@ async def toggle_voice_enabled(
     voice_id: int,
     is_enabled: bool,
     db: Session = Depends(get_db),
-    current_user: Dict[str, Any] = Depends(get_current_user_or_internal),
+    current_user: dict[str, Any] = Depends(get_current_user_or_internal),
 ):
     """Toggle one voice enabled/disabled for the user."""
     try:
         _ensure_user_access(current_user, user_id)
 
-        voice = db.query(VoiceModel).filter(
+        active_voice = db.query(VoiceModel.id).filter(
             VoiceModel.id == voice_id,
             VoiceModel.is_active.is_(True),
         ).first()
-        if not voice:
+        if active_voice is None:
             raise HTTPException(status_code=404, detail="Voice not found")
 
         record = db.query(UserVoiceEnabled).filter(
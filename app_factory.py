@@ -39,9 +39,10 @@ def create_app() -> FastAPI:
 
         logger.info("[START] F5_tts startup")
         try:
-            from database import init_db
+            from database import init_db, warm_pool
 
             init_db()
+            warm_pool()
             logger.info("[OK] Database initialized")
 
             from tts_engine import tts_engine_manager as engine_manager
@@ -114,6 +115,20 @@ def create_app() -> FastAPI:
         allow_headers=["*"],
     )
 
+    from analysis_logging import CorrelationIdMiddleware, get_analysis_logger
+
+    if get_analysis_logger().enabled:
+        app.add_middleware(CorrelationIdMiddleware)
+
+    if config.profile_enabled:
+        from profiling import ProfileMiddleware, profiling_available
+
+        if profiling_available():
+            app.add_middleware(ProfileMiddleware)
+            logger.warning("Request profiling enabled: ?profile=1 returns a pyinstrument report")
+        else:
+            logger.warning("TTS_PROFILE_ENABLED is set but pyinstrument is not installed; profiling disabled")
+
     from admin_api import admin_router
     from api_endpoints import tts_api
     from api_endpoints_voice_enabled import voice_enabled_router
@@ -8,7 +8,7 @@ Asynchronous version of audio converter with worker pool
 import asyncio
 import logging
 import os
-import uuid
+import secrets
 from typing import Optional, Dict, Any
 from concurrent.futures import ThreadPoolExecutor
 import soundfile as sf
@@ -24,6 +24,44 @@ TARGET_BIT_DEPTH = 16  # 16-bit
 TARGET_DURATION_MIN = 3.0  # Minimum 3 seconds
 TARGET_DURATION_MAX = 10.0  # Maximum 10 seconds
 
+# Containers libsndfile reads natively; everything else goes through libav in-process
+# instead of librosa's audioread fallback, which spawns an ffmpeg subprocess per file.
+SOUNDFILE_EXTENSIONS = {'.wav', '.flac', '.ogg', '.aiff', '.aif', '.au'}
+
+
+def _decode_with_av(input_path: str):
+    """Decode audio in-process with PyAV, returning (float32 array [channels, samples] or [samples], sample_rate)"""
+    import av
+
+    chunks = []
+    with av.open(input_path) as container:
+        stream = container.streams.audio[0]
+        sample_rate = stream.codec_context.sample_rate
+        resampler = av.AudioResampler(format='fltp', rate=sample_rate)
+        for frame in container.decode(stream):
+            for resampled in resampler.resample(frame):
+                chunks.append(resampled.to_ndarray())
+        for resampled in resampler.resample(None):
+            chunks.append(resampled.to_ndarray())
+    if not chunks:
+        raise ValueError("No audio frames decoded")
+    audio_data = np.concatenate(chunks, axis=1).astype(np.float32, copy=False)
+    if audio_data.shape[0] == 1:
+        audio_data = audio_data[0]
+    return audio_data, sample_rate
+
+
+def _load_audio(input_path: str):
+    """Load audio at its native rate, preferring in-process decoders over subprocess ones"""
+    if os.path.splitext(input_path)[1].lower() not in SOUNDFILE_EXTENSIONS:
+        try:
+            return _decode_with_av(input_path)
+        except ImportError:
+            pass
+        except Exception:
+            logger.warning(f"PyAV decode failed for {input_path}, falling back to librosa", exc_info=True)
+    return librosa.load(input_path, sr=None, mono=False)
+
 class AsyncAudioConverter:
     """
     Асинхронный конвертер аудио для F5-TTS
@@ -63,7 +101,7 @@ class AsyncAudioConverter:
         Returns:
             str: ID задачи конвертации
         """
-        task_id = str(uuid.uuid4())
+        task_id = secrets.token_hex(16)
         
         # Сохраняем информацию о задаче
         self._conversion_tasks[task_id] = {
@@ -104,7 +142,7 @@ class AsyncAudioConverter:
                 raise ValueError("Input file is empty")
             
             # Load audio file
-            audio_data, sample_rate = librosa.load(input_path, sr=None, mono=False)
+            audio_data, sample_rate = _load_audio(input_path)
             
             # Convert to mono if stereo
             if len(audio_data.shape) > 1:
@@ -206,15 +244,14 @@ class AsyncAudioConverter:
             if os.path.getsize(file_path) == 0:
                 return False
                 
-            # Load audio to check basic properties
-            audio_data, sample_rate = librosa.load(file_path, sr=None, mono=False)
-            
-            # Check if mono
-            if len(audio_data.shape) > 1:
-                audio_data = librosa.to_mono(audio_data)
+            # Duration straight from the header when libsndfile can read it (no decode)
+            try:
+                duration = sf.info(file_path).duration
+            except RuntimeError:
+                audio_data, sample_rate = _load_audio(file_path)
+                duration = audio_data.shape[-1] / sample_rate
             
             # Check duration
-            duration = len(audio_data) / sample_rate
             if duration < TARGET_DURATION_MIN or duration > TARGET_DURATION_MAX:
                 return False
                 
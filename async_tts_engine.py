@@ -199,10 +199,12 @@ class AsyncTTSEngine:
                 tasks_to_remove.append(task_id)
         for task_id in tasks_to_remove:
             task = self.completed_tasks.pop(task_id)
-            if task.result and Path(task.result).exists():
+            if task.result:
                 try:
                     Path(task.result).unlink()
                     logger.info(f'Cleaned up old task file: {task.result}')
+                except FileNotFoundError:
+                    pass
                 except Exception:
                     logger.exception('Error cleaning up task file {task.result}')
         if tasks_to_remove:
@@ -2,7 +2,7 @@ import asyncio
 import logging
 import time
 import json
-from typing import Dict, List, Optional, Any, Tuple
+from typing import Any
 from dataclasses import dataclass
 from enum import Enum
 import redis
@@ -21,7 +21,7 @@ class WorkerTask:
     task_id: str
     text: str
     voice: str
-    user_id: Optional[int]
+    user_id: int | None
     priority: TaskPriority
     created_at: float
     stream_id: str
@@ -38,7 +38,7 @@ class WorkerStats:
     avg_processing_time: float = 0.0
     last_activity: float = 0.0
     is_active: bool = False
-    current_task: Optional[str] = None
+    current_task: str | None = None
 
 class AsyncWorkerManager:
     """Text cleaned."""
@@ -54,8 +54,8 @@ class AsyncWorkerManager:
         self.redis_client = None
         self.gpu_worker_pool = None
         self.tts_engine_manager = None
-        self.workers: Dict[str, asyncio.Task] = {}
-        self.worker_stats: Dict[str, WorkerStats] = {}
+        self.workers: dict[str, asyncio.Task] = {}
+        self.worker_stats: dict[str, WorkerStats] = {}
         self.running = False
         self.priority_queues = {TaskPriority.CRITICAL: asyncio.Queue(), TaskPriority.HIGH: asyncio.Queue(), TaskPriority.NORMAL: asyncio.Queue(), TaskPriority.LOW: asyncio.Queue()}
         self.global_stats = {'total_tasks': 0, 'completed_tasks': 0, 'failed_tasks': 0, 'active_workers': 0, 'queue_sizes': {priority.value: 0 for priority in TaskPriority}, 'avg_processing_time': 0.0, 'last_activity': 0.0}
@@ -139,7 +139,7 @@ class AsyncWorkerManager:
                 logger.exception('Error in task dispatcher')
                 await asyncio.sleep(1)
 
-    async def _get_tasks_from_redis(self) -> List[WorkerTask]:
+    async def _get_tasks_from_redis(self) -> list[WorkerTask]:
         """Получение задач из Redis Stream"""
         try:
             messages = await asyncio.get_event_loop().run_in_executor(None, self._read_redis_stream)
@@ -163,7 +163,7 @@ class AsyncWorkerManager:
             logger.exception('Error getting tasks from Redis')
             return []
 
-    def _read_redis_stream(self) -> List[Tuple[str, Dict[str, str]]]:
+    def _read_redis_stream(self) -> list[tuple[str, dict[str, str]]]:
         """Чтение из Redis Stream"""
         try:
             messages = self.redis_client.xreadgroup(self.consumer_group, 'dispatcher', {self.input_stream: '>'}, count=10, block=100)
@@ -172,7 +172,7 @@ class AsyncWorkerManager:
             logger.exception('Error reading Redis stream')
             return []
 
-    async def _should_use_gpu(self, task_data: Dict[str, Any]) -> bool:
+    async def _should_use_gpu(self, task_data: dict[str, Any]) -> bool:
         """Определение, использовать ли GPU для задачи"""
         try:
             if not self.gpu_worker_pool:
@@ -191,6 +191,15 @@ class AsyncWorkerManager:
             logger.exception('Error checking GPU availability')
             return False
 
+    def _log_usage(self, task: WorkerTask, processing_time: float, success: bool) -> None:
+        """Учёт использования пользователя (блокирующий доступ к БД — вызывается в пуле потоков)"""
+        from database import SessionLocal
+        db = SessionLocal()
+        try:
+            self.tts_limits_service.log_request(user_id=task.user_id, text=task.text, processing_time=processing_time, processing_type='gpu' if task.use_gpu else 'cpu', priority=task.priority.value, success=success, db=db)
+        finally:
+            db.close()
+
     async def _worker_loop(self, worker_id: str):
         """Основной цикл воркера"""
         logger.info(f'Worker {worker_id} started')
@@ -207,16 +216,19 @@ class AsyncWorkerManager:
                     start_time = time.time()
                     success = await self._process_task(task, worker_id)
                     processing_time = time.time() - start_time
+                    if success is None:
+                        # Задача отложена (движок занят): ни успех, ни ошибка - статистику и лимиты не трогаем
+                        stats.is_active = False
+                        stats.current_task = None
+                        clear_correlation_id()
+                        continue
                     if success:
                         stats.tasks_processed += 1
                         self.global_stats['completed_tasks'] += 1
                         log_tts_generation(text=task.text, voice=task.voice, success=True, user_id=task.user_id, duration_ms=processing_time * 1000)
                         if task.user_id:
                             try:
-                                from database import SessionLocal
-                                db = SessionLocal()
-                                self.tts_limits_service.log_request(user_id=task.user_id, text=task.text, processing_time=processing_time, processing_type='gpu' if task.use_gpu else 'cpu', priority=task.priority.value, success=True, db=db)
-                                db.close()
+                                await asyncio.get_event_loop().run_in_executor(None, self._log_usage, task, processing_time, True)
                             except Exception:
                                 logger.exception('Error logging user usage')
                     else:
@@ -225,10 +237,7 @@ class AsyncWorkerManager:
                         log_tts_generation(text=task.text, voice=task.voice, success=False, user_id=task.user_id, duration_ms=processing_time * 1000, error='Processing failed')
                         if task.user_id:
                             try:
-                                from database import SessionLocal
-                                db = SessionLocal()
-                                self.tts_limits_service.log_request(user_id=task.user_id, text=task.text, processing_time=processing_time, processing_type='gpu' if task.use_gpu else 'cpu', priority=task.priority.value, success=False, db=db)
-                                db.close()
+                                await asyncio.get_event_loop().run_in_executor(None, self._log_usage, task, processing_time, False)
                             except Exception:
                                 logger.exception('Error logging failed user usage')
                     total_tasks = stats.tasks_processed + stats.tasks_failed
@@ -248,7 +257,7 @@ class AsyncWorkerManager:
                 clear_correlation_id()
                 await asyncio.sleep(1)
 
-    async def _get_next_task(self) -> Optional[WorkerTask]:
+    async def _get_next_task(self) -> WorkerTask | None:
         """Получение следующей задачи по приоритету"""
         for priority in [TaskPriority.CRITICAL, TaskPriority.HIGH, TaskPriority.NORMAL, TaskPriority.LOW]:
             try:
@@ -259,8 +268,9 @@ class AsyncWorkerManager:
                 continue
         return None
 
-    async def _process_task(self, task: WorkerTask, worker_id: str) -> bool:
-        """Обработка TTS задачи"""
+    async def _process_task(self, task: WorkerTask, worker_id: str) -> bool | None:
+        """Обработка TTS задачи; None - задача отложена, потому что движок занят"""
+        from tts_engine import EngineBusyError
         try:
             if task.use_gpu and self.gpu_worker_pool:
                 result_path = await self._process_gpu_task(task)
@@ -274,12 +284,25 @@ class AsyncWorkerManager:
             else:
                 await self._handle_task_error(task, 'Processing failed')
                 return False
+        except EngineBusyError:
+            self._requeue_busy_task(task)
+            return None
         except Exception as e:
             logger.exception('Error processing task {task.task_id}')
             await self._handle_task_error(task, str(e))
             return False
 
-    async def _process_gpu_task(self, task: WorkerTask) -> Optional[str]:
+    def _requeue_busy_task(self, task: WorkerTask):
+        """Движок занят: через BUSY_RETRY_AFTER вернуть задачу в очередь без ack и без расхода попыток, не занимая воркер"""
+        from tts_engine import BUSY_RETRY_AFTER
+        logger.warning(f'TTS engine busy, requeueing task {task.task_id} in {BUSY_RETRY_AFTER}s')
+        asyncio.get_event_loop().call_later(BUSY_RETRY_AFTER, self._enqueue_task, task)
+
+    def _enqueue_task(self, task: WorkerTask):
+        self.priority_queues[task.priority].put_nowait(task)
+        self.global_stats['queue_sizes'][task.priority.value] += 1
+
+    async def _process_gpu_task(self, task: WorkerTask) -> str | None:
         """Обработка задачи на GPU"""
         try:
             gpu_task_id = await self.gpu_worker_pool.submit_task(text=task.text, voice=task.voice, user_id=task.user_id, priority=task.priority.value)
@@ -297,19 +320,22 @@ class AsyncWorkerManager:
             logger.exception('Error processing GPU task')
             return None
 
-    async def _process_cpu_task(self, task: WorkerTask) -> Optional[str]:
+    async def _process_cpu_task(self, task: WorkerTask) -> str | None:
         """Обработка задачи на CPU"""
         try:
             if not self.tts_engine_manager or not self.tts_engine_manager.is_ready():
                 logger.error('TTS engine not ready')
                 return None
-            result_path = await self.tts_engine_manager.synthesize_speech_async(text=task.text, voice=task.voice, user_id=task.user_id)
-            return result_path
+            result = await self.tts_engine_manager.synthesize_speech_async(text=task.text, voice=task.voice, user_id=task.user_id)
         except Exception:
             logger.exception('Error processing CPU task')
             return None
+        if result.get('busy'):
+            from tts_engine import EngineBusyError
+            raise EngineBusyError(result.get('error', 'TTS engine busy'))
+        return result.get('audio_path') if result.get('success') else None
 
-    async def _send_result(self, task: WorkerTask, result_path: str, error: Optional[str]):
+    async def _send_result(self, task: WorkerTask, result_path: str, error: str | None):
         """Отправка результата в Redis"""
         try:
             result_data = {'task_id': task.task_id, 'status': 'completed' if result_path else 'failed', 'result_path': result_path or '', 'error': error or '', 'processing_time': time.time() - task.created_at, 'completed_at': time.time(), 'worker_id': 'gpu' if task.use_gpu else 'cpu'}
@@ -351,13 +377,13 @@ class AsyncWorkerManager:
             self.redis_client.close()
         logger.info('AsyncWorkerManager stopped')
 
-    def get_stats(self) -> Dict[str, Any]:
+    def get_stats(self) -> dict[str, Any]:
         """Получение статистики"""
         active_workers = sum((1 for stats in self.worker_stats.values() if stats.is_active))
         self.global_stats['active_workers'] = active_workers
         return {**self.global_stats, 'workers': {worker_id: {'tasks_processed': stats.tasks_processed, 'tasks_failed': stats.tasks_failed, 'avg_processing_time': stats.avg_processing_time, 'is_active': stats.is_active, 'current_task': stats.current_task, 'last_activity': stats.last_activity} for (worker_id, stats) in self.worker_stats.items()}, 'queue_sizes': self.global_stats['queue_sizes'], 'running': self.running}
 
-    def get_queue_sizes(self) -> Dict[str, int]:
+    def get_queue_sizes(self) -> dict[str, int]:
         """Получение размеров очередей"""
         return {priority.name: self.priority_queues[priority].qsize() for priority in TaskPriority}
 async_worker_manager = AsyncWorkerManager()
@@ -13,7 +13,6 @@ from typing import Optional
 import soundfile as sf
 import numpy as np
 import librosa
-from pydub import AudioSegment
 
 logger = logging.getLogger(__name__)
 
@@ -3,7 +3,8 @@
 import logging
 import os
 import secrets
-from typing import Any, Dict, Optional, Set
+from functools import lru_cache
+from typing import Any
 
 import jwt
 from dotenv import load_dotenv
@@ -15,8 +16,13 @@ load_dotenv()
 logger = logging.getLogger(__name__)
 security = HTTPBearer(auto_error=False)
 
+# Legacy internal key and deployment environment are fixed for the process lifetime.
+_INTERNAL_API_KEY = os.getenv("TTS_INTERNAL_API_KEY")
+_ENVIRONMENT = (os.getenv("ENVIRONMENT") or os.getenv("ENV") or "development").lower()
+_IS_DEV_ENV = _ENVIRONMENT in {"development", "dev", "testing", "test", "local"}
 
-def _internal_jwt_secret() -> Optional[str]:
+
+def _internal_jwt_secret() -> str | None:
     return os.getenv("INTERNAL_SERVICE_JWT_SECRET") or os.getenv("SECRET_KEY")
 
 
@@ -28,12 +34,16 @@ def _internal_jwt_issuer() -> str:
     return os.getenv("INTERNAL_SERVICE_JWT_ISSUER", "bot_service")
 
 
-def _internal_jwt_allowed_subjects() -> Set[str]:
-    raw = os.getenv("INTERNAL_SERVICE_JWT_ALLOWED_SUBJECTS", "bot_service")
-    return {item.strip() for item in raw.split(",") if item.strip()}
+@lru_cache(maxsize=8)
+def _parse_allowed_subjects(raw: str) -> frozenset[str]:
+    return frozenset(item for item in (part.strip() for part in raw.split(",")) if item)
+
+
+def _internal_jwt_allowed_subjects() -> frozenset[str]:
+    return _parse_allowed_subjects(os.getenv("INTERNAL_SERVICE_JWT_ALLOWED_SUBJECTS", "bot_service"))
 
 
-def _verify_internal_service_jwt(token: str) -> Optional[Dict[str, Any]]:
+def _verify_internal_service_jwt(token: str) -> dict[str, Any] | None:
     """Validate service JWT used for internal bot_service -> F5_tts calls."""
     signing_key = _internal_jwt_secret()
     if not token or not signing_key:
@@ -86,7 +96,7 @@ class TTSAuthManager:
             raise ValueError("SECRET_KEY environment variable is required")
         self.algorithm = os.getenv("ALGORITHM", "HS256")
 
-    def verify_token(self, token: str) -> Dict[str, Any]:
+    def verify_token(self, token: str) -> dict[str, Any]:
         """Verify JWT token and return payload."""
         try:
             payload = jwt.decode(
@@ -111,8 +121,12 @@ class TTSAuthManager:
                 detail="Invalid token",
             ) from exc
 
-    def get_current_user(self, credentials: HTTPAuthorizationCredentials = Depends(security)) -> Dict[str, Any]:
-        """Decode and validate user JWT token."""
+    def get_current_user(self, credentials: HTTPAuthorizationCredentials = Depends(security)) -> dict[str, Any]:
+        """Decode and validate user JWT token.
+
+        Every principal returned by this module carries a "user_id" key, so callers can
+        read it directly instead of falling back to "id".
+        """
         if credentials is None:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -133,7 +147,7 @@ class TTSAuthManager:
 auth_manager = TTSAuthManager()
 
 
-def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> Dict[str, Any]:
+def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> dict[str, Any]:
     """Dependency: require valid user JWT."""
     if credentials is not None:
         return auth_manager.get_current_user(credentials)
@@ -146,9 +160,9 @@ def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(securit
 
 def get_current_user_or_internal(
     request: Request,
-    credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
-    x_internal_service_key: Optional[str] = Header(None, alias="X-Internal-Service-Key"),
-) -> Dict[str, Any]:
+    credentials: HTTPAuthorizationCredentials | None = Depends(security),
+    x_internal_service_key: str | None = Header(None, alias="X-Internal-Service-Key"),
+) -> dict[str, Any]:
     """Allow user JWT, service JWT, or legacy internal key."""
     if credentials is not None:
         service_user = _verify_internal_service_jwt(credentials.credentials)
@@ -161,21 +175,22 @@ def get_current_user_or_internal(
             # Fall through to legacy key/development fallback for backward compatibility.
             pass
 
-    expected_key = os.getenv("TTS_INTERNAL_API_KEY")
-    if expected_key and x_internal_service_key and secrets.compare_digest(x_internal_service_key, expected_key):
+    if (
+        x_internal_service_key
+        and _INTERNAL_API_KEY
+        and secrets.compare_digest(x_internal_service_key, _INTERNAL_API_KEY)
+    ):
         return {"user_id": 0, "is_admin": True, "service": "bot_service", "auth": "legacy_internal_key"}
 
-    environment = (os.getenv("ENVIRONMENT") or os.getenv("ENV") or "development").lower()
-    is_dev_env = environment in {"development", "dev", "testing", "test", "local"}
     if (
-        not expected_key
-        and is_dev_env
+        not _INTERNAL_API_KEY
+        and _IS_DEV_ENV
         and request.client
         and request.client.host in {"127.0.0.1", "::1", "localhost"}
     ):
         logger.warning(
             "Using loopback internal auth fallback in %s because TTS_INTERNAL_API_KEY is not configured",
-            environment,
+            _ENVIRONMENT,
         )
         return {"user_id": 0, "is_admin": True, "service": "loopback", "auth": "loopback_fallback"}
 
@@ -186,7 +201,7 @@ def get_current_user_or_internal(
 
 
 # Dependency for admin access
-def get_admin_user(current_user: Dict[str, Any] = Depends(get_current_user_or_internal)) -> Dict[str, Any]:
+def get_admin_user(current_user: dict[str, Any] = Depends(get_current_user_or_internal)) -> dict[str, Any]:
     """Dependency: require admin role."""
     if not current_user.get("is_admin", False):
         raise HTTPException(
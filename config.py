@@ -1,4 +1,5 @@
 import os
+from functools import cached_property
 from pathlib import Path
 from typing import Optional
 
@@ -52,42 +53,47 @@ class AppConfig(BaseModel):
     port: int = Field(default_factory=lambda: _env_int("TTS_PORT", 8001))
     debug: bool = Field(default_factory=lambda: _env_bool("TTS_DEBUG", True))
 
-    # Paths
+    # Paths (derived paths are computed once per config instance)
     base_dir: Path = Path(__file__).resolve().parent
 
-    @property
+    @cached_property
     def audio_path(self) -> Path:
         return self.base_dir / "audio"
 
-    @property
+    @cached_property
+    def resolved_audio_path(self) -> Path:
+        # Symlink-resolved once; used to build /audio URLs on every synthesis.
+        return self.audio_path.resolve()
+
+    @cached_property
     def voices_path(self) -> Path:
         return self.audio_path / "voices"
 
-    @property
+    @cached_property
     def global_voices_path(self) -> Path:
         return self.voices_path / "global"
 
-    @property
+    @cached_property
     def user_voices_path(self) -> Path:
         return self.voices_path / "user"
 
-    @property
+    @cached_property
     def temp_audio_path(self) -> Path:
         return self.audio_path / "temp"
 
-    @property
+    @cached_property
     def test_audio_path(self) -> Path:
         return self.audio_path / "test"
 
-    @property
+    @cached_property
     def production_audio_path(self) -> Path:
         return self.audio_path / "production"
 
-    @property
+    @cached_property
     def cache_audio_path(self) -> Path:
         return self.audio_path / "cache"
 
-    @property
+    @cached_property
     def user_configs_path(self) -> Path:
         return self.base_dir / "user_configs"
 
@@ -100,9 +106,18 @@ class AppConfig(BaseModel):
         )
     )
     log_file: Optional[str] = Field(default_factory=lambda: os.getenv("TTS_LOG_FILE"))
+    # Per-request pyinstrument profiling via ?profile=1 (needs pyinstrument installed)
+    profile_enabled: bool = Field(default_factory=lambda: _env_bool("TTS_PROFILE_ENABLED", False))
 
     # F5-TTS tunables
     cfg_strength: float = Field(default_factory=lambda: _env_float("TTS_CFG_STRENGTH", 2.5))
+    # Max simultaneous model.infer calls sharing the single loaded model
+    max_concurrent_infer: int = Field(default_factory=lambda: max(1, _env_int("F5_TTS_MAX_CONCURRENT_INFER", 2)))
+    # Seconds a request may wait for an inference slot before being rejected as busy (<= 0 waits forever)
+    infer_queue_timeout: float = Field(default_factory=lambda: _env_float("F5_TTS_INFER_QUEUE_TIMEOUT", 30.0))
+    # Repeated-phrase waveform cache: max entries (0 disables) and max total size of cached waveforms
+    infer_cache_size: int = Field(default_factory=lambda: max(0, _env_int("F5_TTS_INFER_CACHE_SIZE", 8)))
+    infer_cache_max_mb: int = Field(default_factory=lambda: max(0, _env_int("F5_TTS_INFER_CACHE_MAX_MB", 64)))
 
     # Fixed parameters
     target_rms: float = 0.1
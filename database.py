@@ -1,7 +1,8 @@
 import logging
 import os
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, inspect
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import sessionmaker, declarative_base
 
 logger = logging.getLogger(__name__)
@@ -59,10 +60,13 @@ else:
         },
     )
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# Connections opened at startup so the first requests skip TCP/auth setup (bounded by pool_size).
+DB_POOL_WARM_SIZE = int(os.getenv("DB_POOL_WARM_SIZE", "4"))
 Base = declarative_base()
 
 # Keep model fields aligned with bot_service.database where shared.
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, JSON, ForeignKey, Float, UniqueConstraint
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, JSON, ForeignKey, Float, UniqueConstraint, Index, text
 from sqlalchemy.sql import func
 
 
@@ -111,6 +115,21 @@ class Voice(Base):
     silence_duration_ms = Column(Integer, default=100)
     sway_sampling_coef = Column(Float, default=-1.0)
 
+    # Composite indexes for the hot list filters: "active voices of owner X"
+    # and "active global voices". The (voice_type, is_active, owner_id) index
+    # covers the dashboard listing so it can be answered by an index-only scan.
+    __table_args__ = (
+        Index("ix_voices_owner_active", "owner_id", "is_active"),
+        Index("ix_voices_global_active", "is_global", "is_active"),
+        Index(
+            "ix_voices_type_active_owner",
+            "voice_type",
+            "is_active",
+            "owner_id",
+            postgresql_include=["name", "created_at", "cfg_strength", "speed_preset"],
+        ),
+    )
+
 
 class UserVoiceEnabled(Base):
     """Stores whether a specific voice is enabled for a user."""
@@ -125,8 +144,15 @@ class UserVoiceEnabled(Base):
     updated_at = Column(DateTime(timezone=True), default=func.now(), onupdate=func.now())
 
     # One user - one voice toggle row.
+    # Partial covering index serves "enabled voice ids for user" as an index-only scan.
     __table_args__ = (
         UniqueConstraint("user_id", "voice_id", name="uq_user_voice"),
+        Index(
+            "ix_uve_user_enabled",
+            "user_id",
+            postgresql_include=["voice_id"],
+            postgresql_where=text("is_enabled = TRUE"),
+        ),
     )
 
 
@@ -160,6 +186,41 @@ class UserTTSUsage(Base):
     created_at = Column(DateTime(timezone=True), default=func.now())
     updated_at = Column(DateTime(timezone=True), default=func.now(), onupdate=func.now())
 
+    # One row per (user, day): lets usage flushes use INSERT ... ON CONFLICT DO UPDATE.
+    # The INCLUDE columns make the unique index double as the covering index for per-user
+    # period aggregates; together with the date index both aggregates run as index-only scans.
+    __table_args__ = (
+        Index(
+            "uq_user_tts_usage_user_day",
+            "user_id",
+            "date",
+            unique=True,
+            postgresql_include=[
+                "requests_count",
+                "gpu_time_seconds",
+                "cpu_time_seconds",
+                "total_characters",
+                "successful_requests",
+                "failed_requests",
+                "gpu_requests",
+                "cpu_requests",
+            ],
+        ),
+        Index(
+            "ix_user_tts_usage_day_cover",
+            "date",
+            postgresql_include=[
+                "user_id",
+                "requests_count",
+                "gpu_time_seconds",
+                "cpu_time_seconds",
+                "total_characters",
+                "successful_requests",
+                "failed_requests",
+            ],
+        ),
+    )
+
 
 def get_db():
     db = SessionLocal()
@@ -187,9 +248,33 @@ def close_all_connections():
 def init_db():
     """Initializes database schema."""
 
-    # Create all tables.
+    # Reflect existing table names once instead of one has_table() round trip per model,
+    # and only issue CREATE for the tables that are actually missing.
     try:
-        Base.metadata.create_all(bind=engine)
+        inspector = inspect(engine)
+        existing_tables = set(inspector.get_table_names())
+        missing_tables = [
+            table for table in Base.metadata.sorted_tables if table.name not in existing_tables
+        ]
+        if missing_tables:
+            Base.metadata.create_all(bind=engine, tables=missing_tables, checkfirst=False)
+
+        # create_all never touches existing tables. Building indexes here would block writes
+        # during startup, so only report what is missing; migrate_add_indexes.py builds them
+        # with CREATE INDEX CONCURRENTLY.
+        missing_indexes = []
+        for table in Base.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            existing_indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+            missing_indexes.extend(
+                f"{table.name}.{index.name}" for index in table.indexes if index.name not in existing_indexes
+            )
+        if missing_indexes:
+            logger.warning(
+                "[DB] Missing indexes: %s. Run migrate_add_indexes.py to build them.",
+                ", ".join(missing_indexes),
+            )
     except UnicodeDecodeError as exc:
         logger.error(
             "[DB] PostgreSQL connection failed while decoding server response. Check DATABASE_URL in F5_tts/.env."
@@ -197,3 +282,21 @@ def init_db():
         raise RuntimeError(
             "PostgreSQL connection failed due to invalid DATABASE_URL or unreachable PostgreSQL server."
         ) from exc
+
+
+def warm_pool(size: int | None = None) -> None:
+    """Pre-open pooled connections so early requests reuse hot connections."""
+    size = DB_POOL_WARM_SIZE if size is None else size
+    connections = []
+    try:
+        for _ in range(size):
+            conn = engine.connect()
+            connections.append(conn)
+            conn.execute(text("SELECT 1"))
+    except SQLAlchemyError:
+        logger.warning("[DB] Connection pool warm-up stopped early", exc_info=True)
+    finally:
+        # Closing returns the connections to the pool; they stay open for reuse.
+        for conn in connections:
+            conn.close()
+    logger.info("[DB] Warmed %d pooled connection(s)", len(connections))
@@ -35,7 +35,7 @@ class FileManager:
     def delete_voice_file(self, voice_name: str) -> bool:
         """Удалить файл голоса"""
         file_path = self.get_voice_file_path(voice_name)
-        if file_path and file_path.exists():
+        if file_path:
             try:
                 file_path.unlink()
                 logger.info(f'Deleted voice file: {file_path}')
@@ -73,9 +73,10 @@ class FileManager:
     def cleanup_temp_file(self, file_path: Path):
         """Удалить временный файл"""
         try:
-            if file_path.exists():
-                file_path.unlink()
-                logger.info(f'Cleaned up temp file: {file_path}')
+            file_path.unlink()
+            logger.info(f'Cleaned up temp file: {file_path}')
+        except FileNotFoundError:
+            pass
         except Exception:
             logger.exception('Error cleaning up temp file {file_path}')
 
@@ -158,14 +158,23 @@ class GPUIntegrationService:
     async def _process_on_cpu(self, task_id: str, task_data: Dict[str, Any], stream_id: str):
         """Обработка задачи на CPU (fallback)"""
         try:
-            from tts_engine import tts_engine_manager
+            from tts_engine import BUSY_RETRY_AFTER, tts_engine_manager
             if not tts_engine_manager.is_ready():
                 raise RuntimeError('TTS engine not ready')
             text = task_data.get('text', '')
             voice = task_data.get('voice', 'female_1')
             user_id = task_data.get('user_id')
-            result_path = await tts_engine_manager.synthesize_speech_async(text=text, voice=voice, user_id=user_id)
-            await self._send_result(task_id, result_path, None, stream_id)
+            result = await tts_engine_manager.synthesize_speech_async(text=text, voice=voice, user_id=user_id)
+            if result.get('busy'):
+                # Движок занят: не публикуем результат, а ставим задачу обратно в входной поток
+                logger.warning(f'TTS engine busy, requeueing task {task_id} in {BUSY_RETRY_AFTER}s')
+                await asyncio.sleep(BUSY_RETRY_AFTER)
+                self.redis_client.xadd(self.config.input_stream, {'data': json.dumps({**task_data, 'task_id': task_id})})
+                self.redis_client.xack(self.config.input_stream, self.config.consumer_group, stream_id)
+                return
+            if not result.get('success'):
+                raise RuntimeError(result.get('error', 'Synthesis failed'))
+            await self._send_result(task_id, result.get('audio_path'), None, stream_id)
             self.redis_client.xack(self.config.input_stream, self.config.consumer_group, stream_id)
             logger.info(f'Task {task_id} processed on CPU')
         except Exception as e:
@@ -2,7 +2,7 @@
 
 import logging
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy import text
 from sqlalchemy.orm import Session
 
@@ -17,6 +17,9 @@ logger = logging.getLogger(__name__)
 health_router = APIRouter(tags=["health"])
 api_health_router = APIRouter(tags=["health"])
 
+# Liveness body is constant; probes get the pre-encoded bytes without any serialization.
+_LIVE_BODY = b'{"status":"alive","service":"f5_tts"}'
+
 
 @health_router.get("/health")
 async def health_check():
@@ -38,10 +41,10 @@ async def health_check():
     }
 
 
-@health_router.get("/health/live")
+@health_router.get("/health/live", include_in_schema=False)
 async def health_live():
     """Liveness probe: process is up."""
-    return {"status": "alive", "service": "f5_tts"}
+    return Response(content=_LIVE_BODY, media_type="application/json")
 
 
 @health_router.get("/health/ready")
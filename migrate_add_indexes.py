@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""Build model indexes missing on an existing PostgreSQL-based F5_tts DB.
+
+Indexes are built with CREATE INDEX CONCURRENTLY so the tables stay writable;
+run this once after deploying a release that adds indexes, not on every start.
+"""
+
+from __future__ import annotations
+
+from sqlalchemy import text
+from sqlalchemy.schema import CreateIndex
+
+from database import Base, engine
+
+# (table, index) pairs this script is responsible for, in build order.
+INDEXES = (
+    ("voices", "ix_voices_owner_active"),
+    ("voices", "ix_voices_global_active"),
+    ("voices", "ix_voices_type_active_owner"),
+    ("user_voice_enabled", "ix_uve_user_enabled"),
+    ("user_tts_usage", "uq_user_tts_usage_user_day"),
+    ("user_tts_usage", "ix_user_tts_usage_day_cover"),
+)
+
+# Superseded indexes dropped once their replacements are in place.
+OBSOLETE_INDEXES = (
+    # Same key as uq_user_tts_usage_user_day, which now carries its INCLUDE columns.
+    "ix_user_tts_usage_user_day_cover",
+)
+
+USAGE_COUNTERS = (
+    "requests_count",
+    "gpu_time_seconds",
+    "cpu_time_seconds",
+    "total_characters",
+    "successful_requests",
+    "failed_requests",
+    "gpu_requests",
+    "cpu_requests",
+    "critical_requests",
+    "high_requests",
+    "normal_requests",
+    "low_requests",
+)
+
+
+def dedupe_user_tts_usage() -> int:
+    """Fold duplicate (user_id, date) usage rows into the oldest one so the unique index can be built."""
+    sums = ", ".join(f"SUM(COALESCE({field}, 0)) AS {field}" for field in USAGE_COUNTERS)
+    assignments = ", ".join(f"{field} = dup.{field}" for field in USAGE_COUNTERS)
+    with engine.begin() as conn:
+        conn.execute(text("LOCK TABLE user_tts_usage IN SHARE ROW EXCLUSIVE MODE"))
+        merged = conn.execute(
+            text(
+                f"""
+                WITH dup AS (
+                    SELECT MIN(id) AS keep_id, {sums}
+                    FROM user_tts_usage
+                    WHERE date IS NOT NULL
+                    GROUP BY user_id, date
+                    HAVING COUNT(*) > 1
+                )
+                UPDATE user_tts_usage AS u
+                SET {assignments}, updated_at = now()
+                FROM dup
+                WHERE u.id = dup.keep_id
+                """
+            )
+        ).rowcount
+        if merged:
+            conn.execute(
+                text(
+                    """
+                    DELETE FROM user_tts_usage AS u
+                    USING user_tts_usage AS keep
+                    WHERE u.user_id = keep.user_id AND u.date = keep.date AND u.id > keep.id
+                    """
+                )
+            )
+    return merged
+
+
+def _index_is_valid(conn, name: str) -> bool | None:
+    """True/False for an existing index (False = left INVALID by a failed concurrent build), None if absent."""
+    return conn.execute(
+        text(
+            "SELECT i.indisvalid FROM pg_class c JOIN pg_index i ON i.indexrelid = c.oid WHERE c.relname = :name"
+        ),
+        {"name": name},
+    ).scalar()
+
+
+def _index_lacks_include(conn, name: str) -> bool:
+    """True if the existing index has no INCLUDE columns (built before they were added to the model)."""
+    return bool(
+        conn.execute(
+            text(
+                "SELECT i.indnatts = i.indnkeyatts FROM pg_class c JOIN pg_index i ON i.indexrelid = c.oid"
+                " WHERE c.relname = :name"
+            ),
+            {"name": name},
+        ).scalar()
+    )
+
+
+def _create_concurrently(conn, index, name: str | None = None) -> None:
+    ddl = str(CreateIndex(index).compile(dialect=conn.dialect))
+    if name:
+        ddl = ddl.replace(f" {index.name} ON ", f" {name} ON ", 1)
+    conn.execute(text(ddl.replace("INDEX ", "INDEX CONCURRENTLY IF NOT EXISTS ", 1)))
+
+
+def build_index(conn, table_name: str, index_name: str) -> bool:
+    index = next(index for index in Base.metadata.tables[table_name].indexes if index.name == index_name)
+    valid = _index_is_valid(conn, index_name)
+    if valid and index.dialect_options["postgresql"]["include"] and _index_lacks_include(conn, index_name):
+        # Build the new definition next to the old one, then swap, so the key stays enforced throughout.
+        staging = f"{index_name}_new"
+        if _index_is_valid(conn, staging) is False:
+            conn.execute(text(f'DROP INDEX CONCURRENTLY IF EXISTS "{staging}"'))
+        _create_concurrently(conn, index, staging)
+        conn.execute(text(f'DROP INDEX CONCURRENTLY IF EXISTS "{index_name}"'))
+        conn.execute(text(f'ALTER INDEX "{staging}" RENAME TO "{index_name}"'))
+        return True
+    if valid:
+        return False
+    if valid is False:
+        conn.execute(text(f'DROP INDEX CONCURRENTLY IF EXISTS "{index_name}"'))
+    _create_concurrently(conn, index)
+    return True
+
+
+def migrate() -> int:
+    merged = dedupe_user_tts_usage()
+    if merged:
+        print(f"[OK] Merged duplicate user_tts_usage rows into {merged} user-day row(s)")
+
+    analyze = set()
+    # CONCURRENTLY cannot run inside a transaction block.
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        for table_name, index_name in INDEXES:
+            if build_index(conn, table_name, index_name):
+                analyze.add(table_name)
+                print(f"[OK] Built index {index_name} on {table_name}")
+            else:
+                print(f"[OK] Index {index_name} already exists")
+        for index_name in OBSOLETE_INDEXES:
+            if _index_is_valid(conn, index_name) is not None:
+                conn.execute(text(f'DROP INDEX CONCURRENTLY IF EXISTS "{index_name}"'))
+                print(f"[OK] Dropped obsolete index {index_name}")
+        for table_name in sorted(analyze):
+            conn.execute(text(f'ANALYZE "{table_name}"'))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(migrate())
@@ -6,6 +6,10 @@ from typing import Dict, Any
 import threading
 import json
 from pathlib import Path
+try:
+    import orjson
+except ImportError:
+    orjson = None
 logger = logging.getLogger('f5_tts.monitoring')
 
 class SystemMonitor:
@@ -93,8 +97,12 @@ class SystemMonitor:
         try:
             timestamp = datetime.now().strftime('%Y%m%d_%H')
             filename = self.monitoring_dir / f'{self.service_name}_monitoring_{timestamp}.json'
-            with open(filename, 'w', encoding='utf-8') as f:
-                json.dump(self.monitoring_data, f, indent=2, ensure_ascii=False)
+            if orjson is not None:
+                body = orjson.dumps(self.monitoring_data)
+            else:
+                body = json.dumps(self.monitoring_data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+            with open(filename, 'wb') as f:
+                f.write(body)
             logger.debug(f'TTS Monitoring data saved to {filename}')
         except Exception:
             logger.exception('Error saving TTS monitoring data')
@@ -104,19 +112,49 @@ class SystemMonitor:
         if not self.monitoring_data:
             return self.get_system_info()
         latest = self.monitoring_data[-1]
-        recent_data = self.monitoring_data[-60:] if len(self.monitoring_data) >= 60 else self.monitoring_data
-        avg_cpu = sum((d['process']['cpu_percent'] for d in recent_data)) / len(recent_data)
-        avg_memory = sum((d['process']['memory_mb'] for d in recent_data)) / len(recent_data)
-        avg_gpu = sum((d['gpu']['gpu_utilization_percent'] for d in recent_data)) / len(recent_data)
+        recent_data = self.monitoring_data[-60:]
+        total_cpu = total_memory = total_gpu = 0.0
+        for d in recent_data:
+            process = d['process']
+            total_cpu += process['cpu_percent']
+            total_memory += process['memory_mb']
+            total_gpu += d['gpu']['gpu_utilization_percent']
+        avg_cpu = total_cpu / len(recent_data)
+        avg_memory = total_memory / len(recent_data)
+        avg_gpu = total_gpu / len(recent_data)
         return {**latest, 'averages': {'cpu_percent_1h': round(avg_cpu, 2), 'memory_mb_1h': round(avg_memory, 2), 'gpu_percent_1h': round(avg_gpu, 2)}}
 
     def get_monitoring_summary(self) -> Dict[str, Any]:
         """Получение сводки мониторинга"""
         if not self.monitoring_data:
             return {'message': 'No monitoring data available'}
-        data_24h = self.monitoring_data[-1440:] if len(self.monitoring_data) >= 1440 else self.monitoring_data
-        cpu_values = [d['process']['cpu_percent'] for d in data_24h]
-        memory_values = [d['process']['memory_mb'] for d in data_24h]
-        gpu_values = [d['gpu']['gpu_utilization_percent'] for d in data_24h]
-        return {'service': self.service_name, 'monitoring_period': f'{len(data_24h)} records', 'time_range': {'start': data_24h[0]['timestamp'] if data_24h else None, 'end': data_24h[-1]['timestamp'] if data_24h else None}, 'cpu_stats': {'min': round(min(cpu_values), 2), 'max': round(max(cpu_values), 2), 'avg': round(sum(cpu_values) / len(cpu_values), 2)}, 'memory_stats': {'min_mb': round(min(memory_values), 2), 'max_mb': round(max(memory_values), 2), 'avg_mb': round(sum(memory_values) / len(memory_values), 2)}, 'gpu_stats': {'min': round(min(gpu_values), 2), 'max': round(max(gpu_values), 2), 'avg': round(sum(gpu_values) / len(gpu_values), 2)}, 'current': self.get_current_stats()}
+        data_24h = self.monitoring_data[-1440:]
+        # Один проход по записям вместо трёх списков и девяти min/max/sum
+        first_process = data_24h[0]['process']
+        cpu_min = cpu_max = first_process['cpu_percent']
+        memory_min = memory_max = first_process['memory_mb']
+        gpu_min = gpu_max = data_24h[0]['gpu']['gpu_utilization_percent']
+        cpu_total = memory_total = gpu_total = 0.0
+        for d in data_24h:
+            process = d['process']
+            cpu = process['cpu_percent']
+            memory = process['memory_mb']
+            gpu = d['gpu']['gpu_utilization_percent']
+            cpu_total += cpu
+            memory_total += memory
+            gpu_total += gpu
+            if cpu < cpu_min:
+                cpu_min = cpu
+            elif cpu > cpu_max:
+                cpu_max = cpu
+            if memory < memory_min:
+                memory_min = memory
+            elif memory > memory_max:
+                memory_max = memory
+            if gpu < gpu_min:
+                gpu_min = gpu
+            elif gpu > gpu_max:
+                gpu_max = gpu
+        count = len(data_24h)
+        return {'service': self.service_name, 'monitoring_period': f'{count} records', 'time_range': {'start': data_24h[0]['timestamp'], 'end': data_24h[-1]['timestamp']}, 'cpu_stats': {'min': round(cpu_min, 2), 'max': round(cpu_max, 2), 'avg': round(cpu_total / count, 2)}, 'memory_stats': {'min_mb': round(memory_min, 2), 'max_mb': round(memory_max, 2), 'avg_mb': round(memory_total / count, 2)}, 'gpu_stats': {'min': round(gpu_min, 2), 'max': round(gpu_max, 2), 'avg': round(gpu_total / count, 2)}, 'current': self.get_current_stats()}
 tts_monitor = SystemMonitor('f5_tts')
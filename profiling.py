@@ -0,0 +1,71 @@
+# F5_tts/profiling.py
+"""
+Opt-in per-request profiling.
+
+Enable with environment variable: TTS_PROFILE_ENABLED=true (requires pyinstrument),
+then add ?profile=1 to any request. The normal response is discarded and replaced
+by the pyinstrument report: HTML by default, speedscope JSON with
+?profile_format=speedscope (load it at https://www.speedscope.app).
+"""
+from urllib.parse import parse_qs
+
+try:
+    from pyinstrument import Profiler
+    from pyinstrument.renderers import SpeedscopeRenderer
+except ImportError:  # optional: profiling is unavailable without pyinstrument
+    Profiler = None
+    SpeedscopeRenderer = None
+
+PROFILE_INTERVAL = 0.001
+
+
+def profiling_available() -> bool:
+    return Profiler is not None
+
+
+def _profile_format(scope) -> str | None:
+    """Requested report format, or None when the request did not ask for profiling"""
+    raw = scope.get('query_string', b'')
+    if b'profile' not in raw:
+        return None
+    params = parse_qs(raw.decode('latin-1'))
+    if params.get('profile', [''])[0] not in ('1', 'true'):
+        return None
+    return params.get('profile_format', ['html'])[0]
+
+
+class ProfileMiddleware:
+    """Pure ASGI middleware: profiles requests carrying ?profile=1 and returns the report instead"""
+
+    def __init__(self, app, interval: float = PROFILE_INTERVAL):
+        self.app = app
+        self.interval = interval
+
+    async def __call__(self, scope, receive, send):
+        report_format = _profile_format(scope) if scope['type'] == 'http' else None
+        if report_format is None:
+            await self.app(scope, receive, send)
+            return
+
+        async def discard(message):
+            pass
+
+        profiler = Profiler(interval=self.interval, async_mode='enabled')
+        profiler.start()
+        try:
+            await self.app(scope, receive, discard)
+        finally:
+            profiler.stop()
+
+        if report_format == 'speedscope':
+            body = profiler.output(renderer=SpeedscopeRenderer()).encode('utf-8')
+            content_type = b'application/json'
+        else:
+            body = profiler.output_html().encode('utf-8')
+            content_type = b'text/html; charset=utf-8'
+        await send({
+            'type': 'http.response.start',
+            'status': 200,
+            'headers': [(b'content-type', content_type), (b'content-length', str(len(body)).encode('ascii'))],
+        })
+        await send({'type': 'http.response.body', 'body': body})
@@ -1,6 +1,7 @@
 ﻿from fastapi import APIRouter, HTTPException, Depends
 import logging
 import os
+from functools import lru_cache
 from pathlib import Path
 import re
 from sqlalchemy.orm import Session
@@ -23,14 +24,18 @@ def _sanitize_voice_name(value: str) -> str:
     return normalized
 
 
+@lru_cache(maxsize=8)
+def _resolved_base(base_dir: Path) -> str:
+    # Base directories come from config and do not move at runtime; resolve them once.
+    return os.path.realpath(base_dir)
+
+
 def _resolve_under_base(base_dir: Path, relative_name: str) -> Path:
-    candidate = (base_dir / relative_name).resolve()
-    base_resolved = base_dir.resolve()
-    try:
-        candidate.relative_to(base_resolved)
-    except ValueError:
+    base_resolved = _resolved_base(base_dir)
+    candidate = os.path.realpath(os.path.join(base_resolved, relative_name))
+    if not candidate.startswith(base_resolved + os.sep):
         raise HTTPException(status_code=400, detail="Invalid file path")
-    return candidate
+    return Path(candidate)
 
 @router.get("/audio/{voice_name}")
 async def get_audio_file(voice_name: str):
@@ -66,10 +71,11 @@ async def delete_audio_file(
     try:
         safe_voice_name = _sanitize_voice_name(voice_name)
         voice_path = _resolve_under_base(config.audio_path, safe_voice_name)
-        if voice_path.exists():
+        try:
             os.remove(voice_path)
-            return {"status": "success", "message": "File deleted"}
-        raise HTTPException(status_code=404, detail="File not found")
+        except FileNotFoundError:
+            raise HTTPException(status_code=404, detail="File not found")
+        return {"status": "success", "message": "File deleted"}
     except HTTPException:
         raise
     except Exception:
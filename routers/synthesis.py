@@ -1,16 +1,34 @@
-from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks
+from fastapi import APIRouter, HTTPException, Depends, Request
+from fastapi.responses import FileResponse
+import os
 import logging
 import time
-from typing import Optional
-from tts_engine import tts_engine_manager
 from async_tts_engine import async_tts_engine
 from gpu_worker_pool import gpu_worker_pool
 from auth import get_current_user_or_internal
+from config import config
 router = APIRouter(tags=['synthesis'])
 logger = logging.getLogger(__name__)
+AUDIO_URL_PREFIX = '/audio/'
+
+def _wants_inline_audio(body: dict, http_request: Request) -> bool:
+    """Caller asked for the WAV itself (inline flag or Accept: audio/wav) instead of a URL"""
+    return bool(body.get('inline')) or 'audio/wav' in http_request.headers.get('accept', '')
+
+def _local_audio_file(audio_url: str | None) -> str | None:
+    """Local path of a synthesized file named by its /audio URL, if it is on this host"""
+    if not audio_url or not audio_url.startswith(AUDIO_URL_PREFIX):
+        return None
+    # URLs mirror the layout under the audio dir (e.g. /audio/test/x.wav), so keep subdirectories
+    # and make sure the resolved path cannot escape the audio root.
+    base = str(config.resolved_audio_path)
+    candidate = os.path.realpath(os.path.join(base, audio_url[len(AUDIO_URL_PREFIX):]))
+    if not candidate.startswith(base + os.sep):
+        return None
+    return candidate if os.path.isfile(candidate) else None
 
 @router.post('/synthesize-channel')
-async def synthesize_channel(request: dict, current_user: dict=Depends(get_current_user_or_internal)):
+async def synthesize_channel(request: dict, http_request: Request, current_user: dict=Depends(get_current_user_or_internal)):
     """
     Синтезировать аудио для канала с учетом всех настроек пользователя.
     Вызывается из bot_service для обработки сообщений в чате.
@@ -30,7 +48,6 @@ async def synthesize_channel(request: dict, current_user: dict=Depends(get_curre
         voice = tts_settings.get('voice', 'female_1') if tts_settings else 'female_1'
         logger.info(f'[TTS] [CHANNEL TTS] Using voice: {voice} (from tts_settings)')
         from tasks import generate_tts_task
-        from celery.result import AsyncResult
         import asyncio
         import uuid
         message_id = str(uuid.uuid4())
@@ -48,6 +65,10 @@ async def synthesize_channel(request: dict, current_user: dict=Depends(get_curre
             raise HTTPException(status_code=504, detail='Synthesis timed out')
         if result:
             logger.info(f'[OK] [CHANNEL TTS] Синтез успешен для {channel_name} (Task {task.id})')
+            if _wants_inline_audio(request, http_request):
+                local_path = _local_audio_file(result.get('audio_url'))
+                if local_path:
+                    return FileResponse(local_path, media_type='audio/wav', headers={'X-Voice': str(result.get('voice', voice))})
             return {'success': True, 'selected_voice': result.get('voice', voice), 'audio_url': result.get('audio_url'), 'duration': 0, 'tts_type': 'f5'}
         else:
             logger.error(f'[ERROR] [CHANNEL TTS] Синтез не удался: Empty result')
@@ -59,7 +80,7 @@ async def synthesize_channel(request: dict, current_user: dict=Depends(get_curre
         raise HTTPException(status_code=500, detail='Internal server error')
 
 @router.post('/gpu/submit')
-async def submit_gpu_task(text: str, voice: str='female_1', user_id: Optional[int]=None, priority: int=0, current_user: dict=Depends(get_current_user_or_internal)):
+async def submit_gpu_task(text: str, voice: str='female_1', user_id: int | None=None, priority: int=0, current_user: dict=Depends(get_current_user_or_internal)):
     """Отправить задачу напрямую в GPU Worker Pool"""
     try:
         if not hasattr(gpu_worker_pool, 'running') or not gpu_worker_pool.running:
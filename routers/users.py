@@ -1,10 +1,8 @@
 ﻿from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks, UploadFile, File, Form, Query
+import asyncio
 import logging
 import os
-import shutil
-import tempfile
 import re
-from pathlib import Path
 from typing import Optional, Dict, Any
 
 from sqlalchemy.orm import Session
@@ -15,13 +13,15 @@ from tts_engine import tts_engine_manager
 from async_audio_converter import AsyncAudioConverter
 from tts_limits_service import tts_limits_service
 from auth import get_current_user_or_internal
+from admin_api import invalidate_voice_lookup
+from upload_utils import has_valid_audio_signature, spool_upload, staging_path
 
 router = APIRouter(tags=["users"])
 logger = logging.getLogger(__name__)
 
 
 def _get_actor_user_id(current_user: Dict[str, Any]) -> int:
-    user_id = current_user.get("user_id", current_user.get("id"))
+    user_id = current_user.get("user_id")
     if not isinstance(user_id, int):
         raise HTTPException(status_code=401, detail="Invalid authentication payload")
     return user_id
@@ -35,8 +35,11 @@ def _ensure_user_access(current_user: Dict[str, Any], target_user_id: int) -> No
         raise HTTPException(status_code=403, detail="Access denied")
 
 
+VOICE_NAME_DISALLOWED_RE = re.compile(r"[^0-9A-Za-zА-Яа-яЁё _-]+")
+
+
 def _sanitize_voice_name(raw_name: str) -> str:
-    cleaned = re.sub(r"[^0-9A-Za-zА-Яа-яЁё _-]", "", raw_name or "").strip()
+    cleaned = VOICE_NAME_DISALLOWED_RE.sub("", raw_name or "").strip()
     if not cleaned:
         raise HTTPException(status_code=400, detail="Invalid voice name")
     if len(cleaned) > 80:
@@ -44,44 +47,6 @@ def _sanitize_voice_name(raw_name: str) -> str:
     return cleaned
 
 
-def _has_valid_audio_signature(file_path: str) -> bool:
-    """Best-effort magic header validation for common audio containers/codecs."""
-    try:
-        with open(file_path, "rb") as source:
-            header = source.read(16)
-    except OSError:
-        return False
-
-    if len(header) < 4:
-        return False
-
-    # WAV / RIFF
-    if header.startswith(b"RIFF") and len(header) >= 12 and header[8:12] == b"WAVE":
-        return True
-    # MP3 (ID3 tag) or MPEG frame sync
-    if header.startswith(b"ID3") or (header[0] == 0xFF and (header[1] & 0xE0) == 0xE0):
-        return True
-    # OGG
-    if header.startswith(b"OggS"):
-        return True
-    # FLAC
-    if header.startswith(b"fLaC"):
-        return True
-    # MP4/M4A family
-    if len(header) >= 12 and header[4:8] == b"ftyp":
-        return True
-    # WMA/ASF
-    if header.startswith(bytes.fromhex("3026B2758E66CF11")):
-        return True
-    # AIFF
-    if header.startswith(b"FORM") and len(header) >= 12 and header[8:12] in {b"AIFF", b"AIFC"}:
-        return True
-    # AU
-    if header.startswith(b".snd"):
-        return True
-
-    return False
-
 # --- VOICE MANAGEMENT ---
 
 @router.get("/user/voices/{user_id}")
@@ -128,8 +93,7 @@ async def upload_user_voice(
 ):
     """Загрузить пользовательский голос с автоматической конвертацией и транскрибацией"""
     temp_input_path = None
-    temp_converted_path = None
-    final_voice_path = None
+    staged_voice_path = None
     
     try:
         _ensure_user_access(current_user, user_id)
@@ -146,7 +110,7 @@ async def upload_user_voice(
             )
         
         # Проверка дубликатов
-        existing_voice = db.query(VoiceModel).filter(
+        existing_voice = db.query(VoiceModel.id).filter(
             VoiceModel.name == voice_name,
             VoiceModel.owner_id == user_id
         ).first()
@@ -154,28 +118,34 @@ async def upload_user_voice(
             raise HTTPException(status_code=400, detail=f"Голос с именем '{voice_name}' уже существует")
         
         # Сохраняем загруженный файл во временную директорию
-        with tempfile.NamedTemporaryFile(delete=False, suffix=file_extension) as temp_file:
-            shutil.copyfileobj(file.file, temp_file)
-            temp_input_path = temp_file.name
+        temp_input_path = await asyncio.get_event_loop().run_in_executor(
+            None, spool_upload, file.file, file_extension
+        )
 
-        if not _has_valid_audio_signature(temp_input_path):
+        if not has_valid_audio_signature(temp_input_path):
             raise HTTPException(status_code=400, detail="Invalid audio file signature")
         
         logger.info(f"[RECEIVE] User voice uploaded to temp: {temp_input_path}")
         
-        # Конвертируем в WAV с требованиями F5-TTS
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.wav') as temp_converted_file:
-            temp_converted_path = temp_converted_file.name
+        # Конвертируем в WAV с требованиями F5-TTS во временный файл в финальной директории;
+        # на место он переносится только после коммита записи в БД
+        voices_dir = config.user_voices_path / str(user_id)
+        voices_dir.mkdir(parents=True, exist_ok=True)
+        
+        # ВСЕГДА сохраняем как WAV
+        safe_filename = f"{voice_name}.wav"
+        final_voice_path = voices_dir / safe_filename
+        staged_voice_path = staging_path(final_voice_path)
         
         converter = AsyncAudioConverter(max_workers=1)
         await converter.start_workers()
         
         try:
-            success = converter._convert_audio_sync(temp_input_path, temp_converted_path, "user_upload_task")
+            success = converter._convert_audio_sync(temp_input_path, str(staged_voice_path), "user_upload_task")
             if not success:
                 raise Exception("Audio conversion failed")
             
-            logger.info(f"[OK] Audio converted to WAV: {temp_converted_path}")
+            logger.info(f"[OK] Audio converted to WAV: {staged_voice_path}")
         finally:
             await converter.stop_workers()
         
@@ -183,26 +153,13 @@ async def upload_user_voice(
         reference_text = ""
         try:
             if tts_engine_manager.transcriber:
-                reference_text = tts_engine_manager.transcribe(temp_converted_path)
+                reference_text = await tts_engine_manager.transcribe_cached_async(str(staged_voice_path))
                 logger.info(f"[OK] Audio transcribed: '{reference_text[:50]}...'")
             else:
                 logger.warning("[WARN] Transcriber not available, skipping transcription")
         except Exception:
             logger.warning("[WARN] Transcription failed, continuing without reference text", exc_info=True)
         
-        # Сохраняем в финальную директорию
-        voices_dir = config.user_voices_path / str(user_id)
-        voices_dir.mkdir(parents=True, exist_ok=True)
-        
-        # ВСЕГДА сохраняем как WAV
-        safe_filename = f"{voice_name}.wav"
-        final_voice_path = voices_dir / safe_filename
-        
-        # Копируем конвертированный файл
-        shutil.copy2(temp_converted_path, final_voice_path)
-        
-        logger.info(f"[OK] User voice saved: {final_voice_path}")
-        
         # Создаём запись в БД
         new_voice = VoiceModel(
             name=voice_name,
@@ -217,6 +174,10 @@ async def upload_user_voice(
         )
         db.add(new_voice)
         db.commit()
+        os.replace(staged_voice_path, final_voice_path)
+        staged_voice_path = None
+        logger.info(f"[OK] User voice saved: {final_voice_path}")
+        invalidate_voice_lookup()
         db.refresh(new_voice)
         
         logger.info(f"[OK] User voice '{voice_name}' uploaded for user {user_id} (ID: {new_voice.id})")
@@ -240,24 +201,15 @@ async def upload_user_voice(
     except Exception:
         logger.exception("User voice upload error")
         db.rollback()
-        
-        if final_voice_path and Path(final_voice_path).exists():
-            Path(final_voice_path).unlink()
-        
         raise HTTPException(status_code=500, detail="Internal server error")
     
     finally:
-        if temp_input_path and os.path.exists(temp_input_path):
-            try:
-                os.unlink(temp_input_path)
-            except OSError:
-                pass
-        
-        if temp_converted_path and os.path.exists(temp_converted_path):
-            try:
-                os.unlink(temp_converted_path)
-            except OSError:
-                pass
+        for leftover_path in (temp_input_path, staged_voice_path):
+            if leftover_path:
+                try:
+                    os.unlink(leftover_path)
+                except OSError:
+                    pass
 
 @router.delete("/user/voices/{voice_id}")
 async def delete_user_voice(
@@ -281,15 +233,18 @@ async def delete_user_voice(
                 detail="Voice not found or access denied"
             )
         
-        if voice.file_path and os.path.exists(voice.file_path):
+        if voice.file_path:
             try:
-                os.remove(voice.file_path)
+                os.unlink(voice.file_path)
                 logger.info(f"[OK] Deleted voice file: {voice.file_path}")
-            except Exception:
+            except FileNotFoundError:
+                pass
+            except OSError:
                 logger.warning("[WARN] Failed to delete voice file", exc_info=True)
         
         db.delete(voice)
         db.commit()
+        invalidate_voice_lookup()
         
         return {
             "success": True,
@@ -322,7 +277,7 @@ async def rename_user_voice(
         if not voice:
             raise HTTPException(status_code=404, detail="Voice not found or access denied")
         
-        existing_voice = db.query(VoiceModel).filter(
+        existing_voice = db.query(VoiceModel.id).filter(
             VoiceModel.name == new_name,
             VoiceModel.owner_id == user_id,
             VoiceModel.id != voice_id
@@ -332,6 +287,7 @@ async def rename_user_voice(
         
         voice.name = new_name
         db.commit()
+        invalidate_voice_lookup()
         
         return {"status": "success", "message": "Voice renamed successfully"}
         
@@ -359,7 +315,7 @@ async def transcribe_user_voice(
         if not voice:
             raise HTTPException(status_code=404, detail="Voice not found or access denied")
         
-        if not voice.file_path or not os.path.exists(voice.file_path):
+        if not voice.file_path:
             raise HTTPException(status_code=404, detail="Audio file not found")
         
         logger.info(f"[REFRESH] Transcribing user voice {voice_id} ({voice.name})")
@@ -367,16 +323,19 @@ async def transcribe_user_voice(
         reference_text = ""
         try:
             if tts_engine_manager.transcriber:
-                reference_text = tts_engine_manager.transcribe(voice.file_path)
+                reference_text = await tts_engine_manager.transcribe_async(voice.file_path)
                 logger.info(f"[OK] Transcribed: '{reference_text[:50]}...'")
             else:
                 raise Exception("Transcriber not available")
+        except FileNotFoundError:
+            raise HTTPException(status_code=404, detail="Audio file not found")
         except Exception:
             logger.exception("[ERROR] Transcription failed")
             raise HTTPException(status_code=500, detail="Internal server error")
         
         voice.reference_text = reference_text
         db.commit()
+        invalidate_voice_lookup()
         db.refresh(voice)
         
         return {
@@ -443,6 +402,7 @@ async def update_user_voice_settings(
             voice.speed_preset = settings['speed_preset']
         
         db.commit()
+        invalidate_voice_lookup()
         db.refresh(voice)
         
         return {
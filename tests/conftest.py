@@ -0,0 +1,14 @@
+import os
+import sys
+from pathlib import Path
+
+# Service modules are imported top-level (as app_factory does), not as a package.
+SERVICE_ROOT = Path(__file__).resolve().parent.parent
+if str(SERVICE_ROOT) not in sys.path:
+    sys.path.insert(0, str(SERVICE_ROOT))
+
+# database.py refuses non-PostgreSQL URLs unless TESTING is set; tests never open a real connection.
+os.environ.setdefault("TESTING", "true")
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+# auth.py reads it at import; routes under test override the auth dependencies anyway.
+os.environ.setdefault("SECRET_KEY", "test-secret")
@@ -0,0 +1,84 @@
+import pytest
+
+pytest.importorskip("jwt")
+pytest.importorskip("multipart")
+pytest.importorskip("torch")
+pytest.importorskip("numpy")
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import admin_api
+from auth import get_admin_user
+from database import Voice, get_db
+
+
+@pytest.fixture
+def db_session():
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Voice.__table__.create(bind=engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def invalidations(monkeypatch):
+    calls = []
+    monkeypatch.setattr(admin_api, "invalidate_voice_lookup", lambda: calls.append(True))
+    return calls
+
+
+@pytest.fixture
+def client(db_session):
+    app = FastAPI()
+    app.include_router(admin_api.admin_router)
+    app.dependency_overrides[get_db] = lambda: db_session
+    app.dependency_overrides[get_admin_user] = lambda: {"user_id": 1, "is_admin": True}
+    return TestClient(app)
+
+
+def _add_voice(db, name, is_active=True):
+    voice = Voice(name=name, file_path=f"{name}.wav", is_active=is_active)
+    db.add(voice)
+    db.commit()
+    return voice.id
+
+
+def _active_flags(db):
+    db.expire_all()
+    return {voice.name: voice.is_active for voice in db.query(Voice)}
+
+
+def test_bulk_toggle_updates_voices_and_invalidates_lookup(client, db_session, invalidations):
+    first = _add_voice(db_session, "first")
+    second = _add_voice(db_session, "second")
+    _add_voice(db_session, "third")
+
+    response = client.post("/voices/bulk_toggle", json={"ids": [first, second], "is_active": False})
+
+    assert response.status_code == 200
+    assert response.json() == {"status": "success", "updated": 2, "is_active": False}
+    assert _active_flags(db_session) == {"first": False, "second": False, "third": True}
+    assert invalidations == [True]
+
+
+def test_bulk_toggle_rejects_unknown_ids(client, db_session, invalidations):
+    first = _add_voice(db_session, "first")
+
+    response = client.post("/voices/bulk_toggle", json={"ids": [first, 999], "is_active": False})
+
+    assert response.status_code == 404
+    assert "999" in response.json()["detail"]
+    assert _active_flags(db_session) == {"first": True}
+    assert invalidations == []
+
+
+def test_bulk_toggle_validates_payload(client, invalidations):
+    response = client.post("/voices/bulk_toggle", json={"ids": ["1"], "is_active": True})
+
+    assert response.status_code == 400
+    assert invalidations == []
@@ -0,0 +1,64 @@
+import asyncio
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+pytest.importorskip("redis")
+pytest.importorskip("torch")
+pytest.importorskip("numpy")
+
+import tts_engine
+from async_worker_manager import (
+    AsyncWorkerManager,
+    TaskPriority,
+    WorkerStats,
+    WorkerTask,
+)
+from tts_limits_service import TTSLimitsService
+
+
+class _BusyEngine:
+    def is_ready(self):
+        return True
+
+    async def synthesize_speech_async(self, **kwargs):
+        return {"success": False, "error": "TTS engine busy", "busy": True}
+
+
+def test_busy_requeue_skips_failure_and_usage_accounting(monkeypatch):
+    monkeypatch.setattr(tts_engine, "BUSY_RETRY_AFTER", 0.01)
+    limits = TTSLimitsService()
+    monkeypatch.setattr(limits, "_ensure_flusher", lambda: None)
+    manager = AsyncWorkerManager()
+    manager.redis_client = MagicMock()
+    manager.tts_engine_manager = _BusyEngine()
+    manager.tts_limits_service = limits
+    manager.worker_stats["worker_0"] = WorkerStats(worker_id="worker_0")
+    task = WorkerTask(
+        task_id="busy-task",
+        text="привет",
+        voice="female_1",
+        user_id=42,
+        priority=TaskPriority.NORMAL,
+        created_at=time.time(),
+        stream_id="1-0",
+        use_gpu=False,
+    )
+
+    async def scenario():
+        manager.running = True
+        manager._enqueue_task(task)
+        worker = asyncio.create_task(manager._worker_loop("worker_0"))
+        await asyncio.sleep(0.2)
+        manager.running = False
+        await worker
+
+    asyncio.run(scenario())
+
+    stats = manager.worker_stats["worker_0"]
+    assert stats.tasks_failed == 0
+    assert manager.global_stats["failed_tasks"] == 0
+    assert limits._pending_usage == {}
+    assert task.retry_count == 0
+    manager.redis_client.xack.assert_not_called()
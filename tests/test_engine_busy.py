@@ -0,0 +1,57 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("torch")
+pytest.importorskip("numpy")
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import admin_api
+from auth import get_admin_user
+from config import config
+from database import get_db
+from tts_engine import BUSY_RETRY_AFTER, EngineBusyError, TTSEngineManager
+
+
+def test_infer_slot_raises_busy_when_no_slot_frees(monkeypatch):
+    monkeypatch.setattr(config, "infer_queue_timeout", 0.01)
+
+    async def scenario():
+        manager = TTSEngineManager()
+        manager._infer_semaphore = asyncio.Semaphore(1)
+        async with manager._infer_slot():
+            with pytest.raises(EngineBusyError):
+                async with manager._infer_slot():
+                    pass
+        # The slot is released again once the holder is done.
+        async with manager._infer_slot():
+            pass
+
+    asyncio.run(scenario())
+
+
+def test_test_voice_maps_busy_engine_to_429(monkeypatch):
+    voice = SimpleNamespace(owner_id=None, cfg_strength=2.5, speed_preset="normal")
+    monkeypatch.setattr(admin_api, "_lookup_voice_for_test", lambda db, name: voice)
+
+    async def busy_synthesis(**kwargs):
+        return {"success": False, "error": "TTS engine busy", "busy": True}
+
+    monkeypatch.setattr(
+        admin_api.tts_engine_manager, "synthesize_speech_async", busy_synthesis
+    )
+    app = FastAPI()
+    app.include_router(admin_api.admin_router, prefix="/api/admin")
+    app.dependency_overrides[get_admin_user] = lambda: {"user_id": 1, "is_admin": True}
+    app.dependency_overrides[get_db] = lambda: None
+
+    response = TestClient(app).post(
+        "/api/admin/voices/test",
+        data={"voice_name": "female_1", "user_id": 1, "test_text": "привет"},
+    )
+
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == str(BUSY_RETRY_AFTER)
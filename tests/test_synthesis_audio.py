@@ -0,0 +1,42 @@
+import pytest
+
+pytest.importorskip("torch")
+pytest.importorskip("numpy")
+
+from config import config
+from routers.synthesis import _local_audio_file
+
+
+@pytest.fixture
+def audio_root(tmp_path, monkeypatch):
+    root = (tmp_path / "audio").resolve()
+    (root / "test").mkdir(parents=True)
+    monkeypatch.setitem(config.__dict__, "resolved_audio_path", root)
+    return root
+
+
+def test_local_audio_file_keeps_subdirectories(audio_root):
+    (audio_root / "test" / "clip.wav").write_bytes(b"RIFF")
+    (audio_root / "clip.wav").write_bytes(b"RIFF")
+    assert _local_audio_file("/audio/test/clip.wav") == str(
+        audio_root / "test" / "clip.wav"
+    )
+
+
+def test_local_audio_file_missing_file(audio_root):
+    assert _local_audio_file("/audio/test/missing.wav") is None
+
+
+def test_local_audio_file_rejects_paths_outside_root(audio_root):
+    (audio_root.parent / "secret.wav").write_bytes(b"RIFF")
+    assert _local_audio_file("/audio/../secret.wav") is None
+    assert _local_audio_file("/audio/test/../../secret.wav") is None
+
+
+@pytest.mark.parametrize(
+    "audio_url",
+    [None, "", "/media/test/clip.wav", "https://cdn.example/audio/clip.wav"],
+)
+def test_local_audio_file_ignores_foreign_urls(audio_root, audio_url):
+    (audio_root / "test" / "clip.wav").write_bytes(b"RIFF")
+    assert _local_audio_file(audio_url) is None
@@ -0,0 +1,136 @@
+from datetime import datetime
+from unittest.mock import MagicMock
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+
+import tts_limits_service as limits_module
+from database import User, UserTTSUsage
+from tts_limits_service import USAGE_FLUSH_MAX_FAILURES, TTSLimitsService
+
+
+@pytest.fixture
+def service(monkeypatch):
+    svc = TTSLimitsService()
+    monkeypatch.setattr(svc, "_ensure_flusher", lambda: None)
+    yield svc
+    svc._pending_usage.clear()
+
+
+def _pending_requests(svc, user_id):
+    return sum(delta["requests_count"] for (key, delta) in svc._pending_usage.items() if key[1] == user_id)
+
+
+def test_log_request_accumulates_without_touching_session(service):
+    db = MagicMock()
+    for _ in range(3):
+        assert service.log_request(7, "привет", 0.5, "gpu", 2, True, db)
+    assert _pending_requests(service, 7) == 3
+    (delta,) = service._pending_usage.values()
+    assert delta["gpu_requests"] == 3
+    assert delta["gpu_time_seconds"] == pytest.approx(1.5)
+    assert delta["normal_requests"] == 3
+    db.execute.assert_not_called()
+    db.commit.assert_not_called()
+
+
+def test_flush_usage_upserts_once_and_clears_pending(service):
+    db = MagicMock()
+    service.log_request(1, "a", 0.1, "cpu", 1, True, db)
+    service.log_request(2, "bb", 0.2, "gpu", 4, False, db)
+    assert service.flush_usage(db) is True
+    db.execute.assert_called_once()
+    db.commit.assert_called_once()
+    assert service._pending_usage == {}
+    assert service.flush_usage(db) is True
+    db.execute.assert_called_once()
+
+
+def test_failed_flush_merges_increments_back(service):
+    db = MagicMock()
+    db.execute.side_effect = RuntimeError("db down")
+    service.log_request(3, "abc", 1.0, "cpu", 2, True, db)
+    assert service.flush_usage(db) is False
+    db.rollback.assert_called_once()
+    service.log_request(3, "abc", 1.0, "cpu", 2, True, db)
+    assert _pending_requests(service, 3) == 2
+    (delta,) = service._pending_usage.values()
+    assert delta["total_characters"] == 6
+
+
+def test_flush_drops_increments_after_repeated_failures(service):
+    db = MagicMock()
+    db.execute.side_effect = RuntimeError("db down")
+    service.log_request(4, "x", 0.1, "cpu", 2, True, db)
+    for _ in range(USAGE_FLUSH_MAX_FAILURES - 1):
+        assert service.flush_usage(db) is False
+        assert _pending_requests(service, 4) == 1
+    assert service.flush_usage(db) is False
+    assert service._pending_usage == {}
+    assert service._failed_flushes == 0
+
+
+def test_flush_without_session_uses_own_session(service, monkeypatch):
+    own = MagicMock()
+    own.execute.side_effect = RuntimeError("db down")
+    monkeypatch.setattr(limits_module, "SessionLocal", lambda: own)
+    caller_db = MagicMock()
+    service.log_request(5, "x", 0.1, "cpu", 2, True, caller_db)
+    assert service.flush_usage() is False
+    own.rollback.assert_called_once()
+    own.close.assert_called_once()
+    caller_db.rollback.assert_not_called()
+
+
+class _PgError(Exception):
+    def __init__(self, pgcode):
+        super().__init__(pgcode)
+        self.pgcode = pgcode
+
+
+def test_flush_falls_back_to_per_row_without_unique_index(service):
+    db = MagicMock()
+    missing_index = DBAPIError("INSERT ... ON CONFLICT", {}, _PgError("42P10"))
+    db.execute.side_effect = [missing_index, MagicMock(rowcount=1)]
+    service.log_request(6, "x", 0.1, "cpu", 2, True, db)
+    assert service.flush_usage(db) is True
+    assert service._upsert_supported is False
+    db.rollback.assert_called_once()
+    db.commit.assert_called_once()
+    assert service._pending_usage == {}
+
+
+def test_per_row_flush_updates_existing_day_and_inserts_new():
+    engine = create_engine("sqlite://")
+    UserTTSUsage.__table__.create(bind=engine)
+    svc = TTSLimitsService()
+    svc._upsert_supported = False
+    day = datetime(2026, 1, 2)
+    with Session(engine) as db:
+        db.add(UserTTSUsage(user_id=8, date=day, requests_count=2, total_characters=10))
+        db.commit()
+        svc._pending_usage = {
+            (day, 8): dict(limits_module._EMPTY_DAILY_USAGE, requests_count=1, total_characters=3),
+            (day, 9): dict(limits_module._EMPTY_DAILY_USAGE, requests_count=4),
+        }
+        assert svc.flush_usage(db) is True
+        rows = {row.user_id: row for row in db.query(UserTTSUsage).all()}
+    assert (rows[8].requests_count, rows[8].total_characters) == (3, 13)
+    assert rows[9].requests_count == 4
+
+
+def test_validate_request_applies_stored_usage_without_user_row():
+    engine = create_engine("sqlite://")
+    User.__table__.create(bind=engine)
+    UserTTSUsage.__table__.create(bind=engine)
+    svc = TTSLimitsService()
+    (start_of_day, _) = limits_module._today_bounds()
+    with Session(engine) as db:
+        db.add(UserTTSUsage(user_id=0, date=start_of_day, requests_count=svc.global_daily_limit))
+        db.commit()
+        (allowed, message, limits) = svc.validate_request(0, "привет", db)
+    assert allowed is False
+    assert message.startswith("Daily request limit exceeded")
+    assert limits["daily_limit"] == svc.global_daily_limit
@@ -0,0 +1,55 @@
+import pytest
+
+pytest.importorskip("jwt")
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import api_endpoints_voice_enabled as voice_enabled
+from auth import get_current_user_or_internal
+from database import UserVoiceEnabled, Voice, get_db
+
+
+@pytest.fixture
+def db_session():
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Voice.__table__.create(bind=engine)
+    UserVoiceEnabled.__table__.create(bind=engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+    voice_enabled.invalidate_active_voice_ids()
+
+
+@pytest.fixture
+def client(db_session):
+    app = FastAPI()
+    app.include_router(voice_enabled.voice_enabled_router)
+    app.dependency_overrides[get_db] = lambda: db_session
+    app.dependency_overrides[get_current_user_or_internal] = lambda: {"user_id": 1, "is_admin": True}
+    return TestClient(app)
+
+
+def _add_voice(db, name, is_active=True):
+    voice = Voice(name=name, file_path=f"{name}.wav", is_active=is_active)
+    db.add(voice)
+    db.commit()
+    return voice.id
+
+
+def test_writes_ignore_stale_active_voice_cache(client, db_session):
+    first = _add_voice(db_session, "first")
+    assert client.get("/user/voices/enabled/1").json()["enabled_voice_ids"] == [first]
+
+    # Changes made by another worker process never invalidate this process's cache.
+    second = _add_voice(db_session, "second")
+    db_session.get(Voice, first).is_active = False
+    db_session.commit()
+
+    assert client.put(f"/user/voices/enabled/1/{first}", params={"is_enabled": True}).status_code == 404
+    assert client.put(f"/user/voices/enabled/1/{second}", params={"is_enabled": True}).status_code == 200
+    assert client.post("/user/voices/enabled/1", json=[second]).status_code == 200
+    assert client.post("/user/voices/enabled/1", json=[first]).status_code == 400
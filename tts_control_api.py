@@ -16,7 +16,7 @@ _tts_states: Dict[int, Dict[str, bool]] = {}
 
 
 def _actor_user_id(current_user: Dict[str, Any]) -> int:
-    user_id = current_user.get("user_id", current_user.get("id"))
+    user_id = current_user.get("user_id")
     if not isinstance(user_id, int):
         raise HTTPException(status_code=401, detail="Invalid authentication payload")
     return user_id
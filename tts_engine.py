@@ -1,9 +1,23 @@
 import logging
 import asyncio
+import hashlib
+import os
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
 from pathlib import Path
 from TTS_rus_engine.russian_tts import RussianTTS
 from config import config
+from database import SessionLocal, Voice as VoiceModel
 logger = logging.getLogger(__name__)
+BUSY_RETRY_AFTER = 5
+
+def _content_hash():
+    # 128-bit BLAKE2b: faster than SHA-256 on 64-bit CPUs, ample for a cache key
+    return hashlib.blake2b(digest_size=16)
+
+class EngineBusyError(RuntimeError):
+    """No inference slot became free within config.infer_queue_timeout."""
 
 class TTSEngineManager:
 
@@ -11,16 +25,22 @@ class TTSEngineManager:
         self.tts_engine = None
         self.transcriber = None
         self.is_initialized = False
+        self._transcript_cache: OrderedDict = OrderedDict()
+        self._transcript_cache_size = 128
+        self._infer_semaphore = asyncio.Semaphore(config.max_concurrent_infer)
+        # One dedicated thread: Whisper calls are serialized on the single resident model
+        self._transcribe_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='transcriber')
 
     async def initialize(self):
         """Text cleaned."""
         try:
             logger.info('Initializing AI TTS engine (F5-TTS)...')
             self.tts_engine = RussianTTS()
-            import os
             if os.getenv('DISABLE_TRANSCRIPTION', 'false').lower() == 'true':
                 logger.info('Transcription disabled via DISABLE_TRANSCRIPTION env variable')
                 self.transcriber = None
+            elif self.transcriber is not None:
+                logger.info('Reusing already loaded Faster-Whisper transcriber')
             else:
                 try:
                     from faster_whisper import WhisperModel
@@ -79,12 +99,31 @@ class TTSEngineManager:
         else:
             return True
 
+    @asynccontextmanager
+    async def _infer_slot(self):
+        """Занять слот инференса; EngineBusyError, если слот не освободился за infer_queue_timeout"""
+        timeout = config.infer_queue_timeout
+        if timeout > 0:
+            try:
+                await asyncio.wait_for(self._infer_semaphore.acquire(), timeout)
+            except TimeoutError:
+                raise EngineBusyError(f'No inference slot free after {timeout:.0f}s') from None
+        else:
+            await self._infer_semaphore.acquire()
+        try:
+            yield
+        finally:
+            self._infer_semaphore.release()
+
     async def synthesize(self, text: str, voice_name: str, output_path: str, **kwargs) -> bool:
         """Синтез речи"""
         if not self.is_ready():
             raise RuntimeError('TTS engine not initialized')
         try:
-            return await self.tts_engine.synthesize(text, voice_name, output_path, **kwargs)
+            async with self._infer_slot():
+                return await self.tts_engine.synthesize(text, voice_name, output_path, **kwargs)
+        except EngineBusyError:
+            raise
         except Exception:
             logger.exception('Error during synthesis')
             raise
@@ -95,7 +134,6 @@ class TTSEngineManager:
             return {'success': False, 'error': 'TTS engine not initialized'}
         try:
             logger.info(f"[MIC] Synthesizing for {channel_name} | {author}: '{text[:50]}...'")
-            from database import SessionLocal, Voice as VoiceModel
             db = SessionLocal()
             try:
                 voice_record = db.query(VoiceModel).filter(VoiceModel.name == voice).first()
@@ -141,11 +179,13 @@ class TTSEngineManager:
             finally:
                 db.close()
             loop = asyncio.get_event_loop()
-            audio_path = await loop.run_in_executor(None, self.tts_engine.synthesize_speech, text, ref_audio_path, ref_text, None, None, None, False, None, cfg_strength, None, speed_preset)
-            if audio_path and Path(audio_path).exists():
+            async with self._infer_slot():
+                audio_path = await loop.run_in_executor(None, self.tts_engine.synthesize_speech, text, ref_audio_path, ref_text, None, None, None, False, None, cfg_strength, None, speed_preset)
+            audio_path_obj = Path(audio_path) if audio_path else None
+            if audio_path_obj is not None and audio_path_obj.exists():
                 logger.info(f'[OK] Speech synthesized: {audio_path}')
-                audio_path_obj = Path(audio_path).resolve()
-                abs_audio_path = config.audio_path.resolve()
+                audio_path_obj = audio_path_obj.resolve()
+                abs_audio_path = config.resolved_audio_path
                 try:
                     relative_path = audio_path_obj.relative_to(abs_audio_path)
                     audio_url = f'/audio/{relative_path.as_posix()}'
@@ -155,6 +195,9 @@ class TTSEngineManager:
             else:
                 logger.error('[ERROR] TTS synthesis failed: no audio file generated')
                 return {'success': False, 'error': 'No audio file generated'}
+        except EngineBusyError:
+            logger.warning('[BUSY] TTS synthesis rejected: all inference slots are busy')
+            return {'success': False, 'error': 'TTS engine busy', 'busy': True}
         except Exception:
             logger.exception('[ERROR] TTS synthesis error')
             return {'success': False, 'error': 'Synthesis failed'}
@@ -204,9 +247,10 @@ class TTSEngineManager:
                 logger.error('Audio conversion task did not complete in time')
                 return synthesis_result
             try:
-                if original_path.exists():
-                    original_path.unlink()
-                    logger.info(f'Removed original file after conversion: {original_path}')
+                original_path.unlink()
+                logger.info(f'Removed original file after conversion: {original_path}')
+            except FileNotFoundError:
+                pass
             except Exception:
                 logger.warning('Failed to remove original file', exc_info=True)
             logger.info(f'Speech synthesized and converted successfully: {conversion_result}')
@@ -235,4 +279,29 @@ class TTSEngineManager:
         except Exception:
             logger.exception('Error during transcription')
             raise
+
+    def transcribe_cached(self, audio_path: str) -> str:
+        """Транскрипция с кэшем по BLAKE2b-хэшу содержимого файла (повторные загрузки того же аудио)"""
+        with open(audio_path, 'rb') as f:
+            digest = hashlib.file_digest(f, _content_hash).hexdigest()
+        cached = self._transcript_cache.get(digest)
+        if cached is not None:
+            self._transcript_cache.move_to_end(digest)
+            logger.info('Transcription cache hit, skipping ASR')
+            return cached
+        text = self.transcribe(audio_path)
+        self._transcript_cache[digest] = text
+        if len(self._transcript_cache) > self._transcript_cache_size:
+            self._transcript_cache.popitem(last=False)
+        return text
+
+    async def transcribe_async(self, audio_path: str) -> str:
+        """transcribe в выделенном потоке: распознавание Whisper не блокирует event loop"""
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(self._transcribe_executor, self.transcribe, audio_path)
+
+    async def transcribe_cached_async(self, audio_path: str) -> str:
+        """transcribe_cached в выделенном потоке (хэширование файла и распознавание)"""
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(self._transcribe_executor, self.transcribe_cached, audio_path)
 tts_engine_manager = TTSEngineManager()
@@ -1,11 +1,67 @@
+import atexit
 import logging
+import threading
 import time
-from datetime import datetime, timedelta
-from typing import Dict, Any, Optional, Tuple
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from typing import Any
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_
-from database import User, UserTTSUsage
+from sqlalchemy import and_, bindparam, func, select
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from database import SessionLocal, User, UserTTSUsage
 logger = logging.getLogger(__name__)
+USER_LIMITS_TTL = 30.0
+USER_LIMITS_MAXSIZE = 1024
+MAX_TEXT_LENGTH_CAP = 1000
+USAGE_FLUSH_INTERVAL = 2.0
+USAGE_FLUSH_MAX_PENDING = 256
+# После стольких неудачных сбросов подряд накопленные инкременты отбрасываются (с ошибкой в логе)
+USAGE_FLUSH_MAX_FAILURES = 30
+# SQLSTATE invalid_column_reference: для ON CONFLICT (user_id, date) нет подходящего уникального индекса
+_NO_CONFLICT_TARGET_PGCODE = '42P10'
+_day_bounds_cache: list = [0.0, None]
+_USAGE_FIELDS = ('requests_count', 'gpu_time_seconds', 'cpu_time_seconds', 'total_characters', 'successful_requests', 'failed_requests', 'gpu_requests', 'cpu_requests', 'critical_requests', 'high_requests', 'normal_requests', 'low_requests')
+_EMPTY_DAILY_USAGE = {'requests_count': 0, 'gpu_time_seconds': 0.0, 'cpu_time_seconds': 0.0, 'total_characters': 0, 'successful_requests': 0, 'failed_requests': 0, 'gpu_requests': 0, 'cpu_requests': 0, 'critical_requests': 0, 'high_requests': 0, 'normal_requests': 0, 'low_requests': 0}
+_PRIORITY_FIELDS = {4: 'critical_requests', 3: 'high_requests', 2: 'normal_requests', 1: 'low_requests'}
+_EMPTY_USER_STATS = {'total_requests': 0, 'total_gpu_time': 0.0, 'total_cpu_time': 0.0, 'total_characters': 0, 'successful_requests': 0, 'failed_requests': 0, 'gpu_requests': 0, 'cpu_requests': 0, 'success_rate': 0.0, 'avg_processing_time': 0.0}
+_EMPTY_GLOBAL_STATS = {'unique_users': 0, 'total_requests': 0, 'total_gpu_time': 0.0, 'total_cpu_time': 0.0, 'total_characters': 0, 'successful_requests': 0, 'failed_requests': 0, 'success_rate': 0.0, 'avg_requests_per_user': 0.0}
+# Период-агрегаты строятся один раз; на вызове меняются только связанные параметры
+_USER_STATS_STMT = select(func.sum(UserTTSUsage.requests_count).label('total_requests'), func.sum(UserTTSUsage.gpu_time_seconds).label('total_gpu_time'), func.sum(UserTTSUsage.cpu_time_seconds).label('total_cpu_time'), func.sum(UserTTSUsage.total_characters).label('total_characters'), func.sum(UserTTSUsage.successful_requests).label('successful_requests'), func.sum(UserTTSUsage.failed_requests).label('failed_requests'), func.sum(UserTTSUsage.gpu_requests).label('gpu_requests'), func.sum(UserTTSUsage.cpu_requests).label('cpu_requests')).where(and_(UserTTSUsage.user_id == bindparam('user_id'), UserTTSUsage.date >= bindparam('start_date'), UserTTSUsage.date <= bindparam('end_date')))
+_GLOBAL_STATS_STMT = select(func.count(func.distinct(UserTTSUsage.user_id)).label('unique_users'), func.sum(UserTTSUsage.requests_count).label('total_requests'), func.sum(UserTTSUsage.gpu_time_seconds).label('total_gpu_time'), func.sum(UserTTSUsage.cpu_time_seconds).label('total_cpu_time'), func.sum(UserTTSUsage.total_characters).label('total_characters'), func.sum(UserTTSUsage.successful_requests).label('successful_requests'), func.sum(UserTTSUsage.failed_requests).label('failed_requests')).where(and_(UserTTSUsage.date >= bindparam('start_date'), UserTTSUsage.date <= bindparam('end_date')))
+# Поле патча лимитов -> (колонка User, минимум, максимум)
+_LIMIT_COLUMNS = {'max_text_length': ('tts_max_text_length', 10, MAX_TEXT_LENGTH_CAP), 'daily_limit': ('tts_daily_limit', 1, 1000), 'gpu_time_limit': ('tts_gpu_time_limit', 10.0, 3600.0), 'priority_level': ('tts_priority_level', 1, 4)}
+
+def _sanitize_limits_patch(limits: Any) -> dict[str, Any]:
+    """Патч лимитов (dict или pydantic-схема) -> значения колонок User, ограниченные допустимыми диапазонами"""
+    if not isinstance(limits, dict):
+        limits = limits.model_dump(exclude_unset=True) if hasattr(limits, 'model_dump') else dict(limits)
+    patch = {}
+    for (key, (column, low, high)) in _LIMIT_COLUMNS.items():
+        if key in limits:
+            value = limits[key]
+            patch[column] = min(max(value, low), high)
+    if 'tts_enabled' in limits:
+        patch['tts_enabled'] = bool(limits['tts_enabled'])
+    return patch
+
+def _today_bounds() -> tuple[datetime, datetime]:
+    """Начало сегодняшнего и завтрашнего дня (локальное время); пересчитывается только при смене суток"""
+    if time.time() < _day_bounds_cache[0]:
+        return _day_bounds_cache[1]
+    start_of_day = datetime.combine(datetime.now().date(), datetime.min.time())
+    bounds = (start_of_day, start_of_day + timedelta(days=1))
+    _day_bounds_cache[:] = [bounds[1].timestamp(), bounds]
+    return bounds
+
+@lru_cache(maxsize=64)
+def _period_bounds_for_day(start_of_day: datetime, days: int) -> tuple[date, date]:
+    end_date = start_of_day.date()
+    return (end_date - timedelta(days=days), end_date)
+
+def _period_bounds(days: int) -> tuple[date, date]:
+    """(начало, конец) периода статистики в днях; одинаково для всех вызовов в пределах суток"""
+    return _period_bounds_for_day(_today_bounds()[0], days)
 
 class TTSLimitsService:
     """
@@ -21,35 +77,80 @@ class TTSLimitsService:
         self.global_max_text_length = int(os.getenv('TTS_MAX_TEXT_LENGTH', '200'))
         self.global_daily_limit = int(os.getenv('TTS_DAILY_LIMIT', '100'))
         self.global_gpu_time_limit = float(os.getenv('TTS_GPU_TIME_LIMIT', '300.0'))
+        self.text_length_hard_cap = max(MAX_TEXT_LENGTH_CAP, self.global_max_text_length)
+        self._limits_cache: dict[int, tuple[float, dict[str, Any]]] = {}
+        self._limits_lock = threading.Lock()
+        self._pending_usage: dict[tuple[datetime, int], dict[str, Any]] = {}
+        self._pending_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._failed_flushes = 0
+        self._upsert_supported = True
+        self._flush_wakeup = threading.Event()
+        self._flusher: threading.Thread | None = None
+        atexit.register(self._flush_usage_at_exit)
+
+    def _default_limits(self) -> dict[str, Any]:
+        return {'max_text_length': self.global_max_text_length, 'daily_limit': self.global_daily_limit, 'gpu_time_limit': self.global_gpu_time_limit, 'priority_level': self.global_priority_level, 'tts_enabled': True}
+
+    def invalidate_user_limits(self, user_id: int | None=None) -> None:
+        """Сбросить кэш лимитов пользователя (или всех пользователей)"""
+        with self._limits_lock:
+            if user_id is None:
+                self._limits_cache.clear()
+            else:
+                self._limits_cache.pop(user_id, None)
+
+    def _cached_limits(self, user_id: int) -> dict[str, Any] | None:
+        cached = self._limits_cache.get(user_id)
+        if cached and cached[0] > time.monotonic():
+            return dict(cached[1])
+        return None
 
-    def get_user_limits(self, user_id: int, db: Session) -> Dict[str, Any]:
-        """Получить лимиты пользователя"""
+    def _store_limits(self, user_id: int, limits: dict[str, Any]) -> None:
+        # Вызывается и из потоков executor'а: вытеснение и запись под блокировкой
+        with self._limits_lock:
+            if user_id not in self._limits_cache and len(self._limits_cache) >= USER_LIMITS_MAXSIZE:
+                self._limits_cache.pop(next(iter(self._limits_cache)), None)
+            self._limits_cache[user_id] = (time.monotonic() + USER_LIMITS_TTL, dict(limits))
+
+    def _limits_from_user(self, user: User | None) -> dict[str, Any]:
+        if not user:
+            return self._default_limits()
+        return {'max_text_length': user.tts_max_text_length or self.global_max_text_length, 'daily_limit': user.tts_daily_limit or self.global_daily_limit, 'gpu_time_limit': user.tts_gpu_time_limit or self.global_gpu_time_limit, 'priority_level': user.tts_priority_level or self.global_priority_level, 'tts_enabled': user.tts_enabled if user.tts_enabled is not None else True}
+
+    def _usage_from_row(self, usage: UserTTSUsage | None, start_of_day: datetime, user_id: int) -> dict[str, Any]:
+        """Словарь использования за день из строки БД плюс ещё не сброшенные инкременты"""
+        result = dict(_EMPTY_DAILY_USAGE) if not usage else {field: getattr(usage, field) for field in _USAGE_FIELDS}
+        pending = self._pending_usage.get((start_of_day, user_id))
+        if pending is not None:
+            for (field, value) in pending.items():
+                result[field] = (result[field] or 0) + value
+        return result
+
+    def get_user_limits(self, user_id: int, db: Session) -> dict[str, Any]:
+        """Получить лимиты пользователя (кэшируются в памяти на USER_LIMITS_TTL секунд)"""
+        limits = self._cached_limits(user_id)
+        if limits is not None:
+            return limits
         try:
             user = db.query(User).filter(User.id == user_id).first()
-            if not user:
-                return {'max_text_length': self.global_max_text_length, 'daily_limit': self.global_daily_limit, 'gpu_time_limit': self.global_gpu_time_limit, 'priority_level': self.global_priority_level, 'tts_enabled': True}
-            return {'max_text_length': user.tts_max_text_length or self.global_max_text_length, 'daily_limit': user.tts_daily_limit or self.global_daily_limit, 'gpu_time_limit': user.tts_gpu_time_limit or self.global_gpu_time_limit, 'priority_level': user.tts_priority_level or self.global_priority_level, 'tts_enabled': user.tts_enabled if user.tts_enabled is not None else True}
         except Exception:
             logger.exception('Error getting user limits for user {user_id}')
-            return {'max_text_length': self.global_max_text_length, 'daily_limit': self.global_daily_limit, 'gpu_time_limit': self.global_gpu_time_limit, 'priority_level': self.global_priority_level, 'tts_enabled': True}
+            return self._default_limits()
+        limits = self._limits_from_user(user)
+        self._store_limits(user_id, limits)
+        return limits
 
-    def update_user_limits(self, user_id: int, limits: Dict[str, Any], db: Session) -> bool:
+    def update_user_limits(self, user_id: int, limits: dict[str, Any], db: Session) -> bool:
         """Обновить лимиты пользователя"""
         try:
             user = db.query(User).filter(User.id == user_id).first()
             if not user:
                 return False
-            if 'max_text_length' in limits:
-                user.tts_max_text_length = max(10, min(1000, limits['max_text_length']))
-            if 'daily_limit' in limits:
-                user.tts_daily_limit = max(1, min(1000, limits['daily_limit']))
-            if 'gpu_time_limit' in limits:
-                user.tts_gpu_time_limit = max(10.0, min(3600.0, limits['gpu_time_limit']))
-            if 'priority_level' in limits:
-                user.tts_priority_level = max(1, min(4, limits['priority_level']))
-            if 'tts_enabled' in limits:
-                user.tts_enabled = bool(limits['tts_enabled'])
+            for (column, value) in _sanitize_limits_patch(limits).items():
+                setattr(user, column, value)
             db.commit()
+            self.invalidate_user_limits(user_id)
             logger.info(f'Updated TTS limits for user {user_id}: {limits}')
             return True
         except Exception:
@@ -57,16 +158,33 @@ class TTSLimitsService:
             db.rollback()
             return False
 
-    def validate_request(self, user_id: int, text: str, db: Session) -> Tuple[bool, str, Dict[str, Any]]:
+    def validate_request(self, user_id: int, text: str, db: Session) -> tuple[bool, str, dict[str, Any]]:
         """Проверить, можно ли выполнить запрос"""
         try:
-            limits = self.get_user_limits(user_id, db)
+            if len(text) > self.text_length_hard_cap:
+                # Ни один пользовательский лимит не может быть выше — БД не нужна
+                return (False, f'Text too long. Maximum {self.text_length_hard_cap} characters, got {len(text)}', self._default_limits())
+            (start_of_day, next_day) = _today_bounds()
+            limits = self._cached_limits(user_id)
+            usage = None
+            if limits is None:
+                # Лимиты и использование за сегодня — одним запросом вместо двух
+                row = db.query(User, UserTTSUsage).outerjoin(UserTTSUsage, and_(UserTTSUsage.user_id == User.id, UserTTSUsage.date >= start_of_day, UserTTSUsage.date < next_day)).filter(User.id == user_id).first()
+                if row is not None:
+                    (user, usage_row) = row
+                    usage = self._usage_from_row(usage_row, start_of_day, user_id)
+                else:
+                    # Строки User нет (сервисные принципалы, пользователи только из внешнего сервиса):
+                    # использование за сегодня всё равно берётся из БД ниже через get_daily_usage
+                    user = None
+                limits = self._limits_from_user(user)
+                self._store_limits(user_id, limits)
             if not limits['tts_enabled']:
                 return (False, 'TTS is disabled for this user', limits)
             if len(text) > limits['max_text_length']:
                 return (False, f"Text too long. Maximum {limits['max_text_length']} characters, got {len(text)}", limits)
-            today = datetime.now().date()
-            usage = self.get_daily_usage(user_id, today, db)
+            if usage is None:
+                usage = self.get_daily_usage(user_id, start_of_day.date(), db)
             if usage['requests_count'] >= limits['daily_limit']:
                 return (False, f"Daily request limit exceeded. Limit: {limits['daily_limit']}, used: {usage['requests_count']}", limits)
             if usage['gpu_time_seconds'] >= limits['gpu_time_limit']:
@@ -76,65 +194,153 @@ class TTSLimitsService:
             logger.exception('Error validating request for user {user_id}')
             return (False, 'Validation error', {})
 
-    def get_daily_usage(self, user_id: int, date: datetime.date, db: Session) -> Dict[str, Any]:
+    def get_daily_usage(self, user_id: int, date: datetime.date, db: Session) -> dict[str, Any]:
         """Получить использование за день"""
         try:
-            start_of_day = datetime.combine(date, datetime.min.time())
-            end_of_day = datetime.combine(date, datetime.max.time())
-            usage = db.query(UserTTSUsage).filter(and_(UserTTSUsage.user_id == user_id, UserTTSUsage.date >= start_of_day, UserTTSUsage.date <= end_of_day)).first()
-            if not usage:
-                return {'requests_count': 0, 'gpu_time_seconds': 0.0, 'cpu_time_seconds': 0.0, 'total_characters': 0, 'successful_requests': 0, 'failed_requests': 0, 'gpu_requests': 0, 'cpu_requests': 0, 'critical_requests': 0, 'high_requests': 0, 'normal_requests': 0, 'low_requests': 0}
-            return {'requests_count': usage.requests_count, 'gpu_time_seconds': usage.gpu_time_seconds, 'cpu_time_seconds': usage.cpu_time_seconds, 'total_characters': usage.total_characters, 'successful_requests': usage.successful_requests, 'failed_requests': usage.failed_requests, 'gpu_requests': usage.gpu_requests, 'cpu_requests': usage.cpu_requests, 'critical_requests': usage.critical_requests, 'high_requests': usage.high_requests, 'normal_requests': usage.normal_requests, 'low_requests': usage.low_requests}
+            (start_of_day, next_day) = _today_bounds()
+            if date != start_of_day.date():
+                start_of_day = datetime.combine(date, datetime.min.time())
+                next_day = start_of_day + timedelta(days=1)
+            usage = db.query(UserTTSUsage).filter(and_(UserTTSUsage.user_id == user_id, UserTTSUsage.date >= start_of_day, UserTTSUsage.date < next_day)).first()
+            return self._usage_from_row(usage, start_of_day, user_id)
         except Exception:
             logger.exception('Error getting daily usage for user {user_id}')
             return {}
 
     def log_request(self, user_id: int, text: str, processing_time: float, processing_type: str, priority: int, success: bool, db: Session) -> bool:
-        """Логировать запрос пользователя"""
+        """Логировать запрос пользователя (инкременты копятся в памяти и сбрасываются в БД пачкой)"""
         try:
-            today = datetime.now().date()
-            start_of_day = datetime.combine(today, datetime.min.time())
-            usage = db.query(UserTTSUsage).filter(and_(UserTTSUsage.user_id == user_id, UserTTSUsage.date >= start_of_day, UserTTSUsage.date < start_of_day + timedelta(days=1))).first()
-            if not usage:
-                usage = UserTTSUsage(user_id=user_id, date=start_of_day)
-                db.add(usage)
-            usage.requests_count += 1
-            usage.total_characters += len(text)
-            if success:
-                usage.successful_requests += 1
-            else:
-                usage.failed_requests += 1
-            if processing_type == 'gpu':
-                usage.gpu_requests += 1
-                usage.gpu_time_seconds += processing_time
-            else:
-                usage.cpu_requests += 1
-                usage.cpu_time_seconds += processing_time
-            if priority == 4:
-                usage.critical_requests += 1
-            elif priority == 3:
-                usage.high_requests += 1
-            elif priority == 2:
-                usage.normal_requests += 1
-            elif priority == 1:
-                usage.low_requests += 1
-            usage.updated_at = datetime.now()
-            db.commit()
+            (start_of_day, _) = _today_bounds()
+            priority_field = _PRIORITY_FIELDS.get(priority)
+            with self._pending_lock:
+                delta = self._pending_usage.get((start_of_day, user_id))
+                if delta is None:
+                    delta = self._pending_usage[(start_of_day, user_id)] = dict.fromkeys(_USAGE_FIELDS, 0)
+                delta['requests_count'] += 1
+                delta['total_characters'] += len(text)
+                delta['successful_requests' if success else 'failed_requests'] += 1
+                if processing_type == 'gpu':
+                    delta['gpu_requests'] += 1
+                    delta['gpu_time_seconds'] += processing_time
+                else:
+                    delta['cpu_requests'] += 1
+                    delta['cpu_time_seconds'] += processing_time
+                if priority_field is not None:
+                    delta[priority_field] += 1
+                if len(self._pending_usage) >= USAGE_FLUSH_MAX_PENDING:
+                    self._flush_wakeup.set()
+            self._ensure_flusher()
             logger.info(f'Logged TTS request for user {user_id}: {len(text)} chars, {processing_time:.2f}s {processing_type}, priority {priority}, success: {success}')
             return True
         except Exception:
             logger.exception('Error logging request for user {user_id}')
+            return False
+
+    def _ensure_flusher(self) -> None:
+        """Запустить фоновый поток сброса (лениво, в процессе, который реально логирует запросы)"""
+        if self._flusher is not None and self._flusher.is_alive():
+            return
+        with self._flush_lock:
+            if self._flusher is not None and self._flusher.is_alive():
+                return
+            self._flusher = threading.Thread(target=self._flush_loop, name='tts-usage-flusher', daemon=True)
+            self._flusher.start()
+
+    def _flush_loop(self) -> None:
+        """Сбрасывать инкременты не реже раза в USAGE_FLUSH_INTERVAL секунд (или сразу при переполнении)"""
+        while True:
+            self._flush_wakeup.wait(USAGE_FLUSH_INTERVAL)
+            self._flush_wakeup.clear()
+            try:
+                self.flush_usage()
+            except Exception:
+                logger.exception('TTS usage flusher iteration failed')
+
+    def flush_usage(self, db: Session | None=None) -> bool:
+        """Записать накопленные инкременты использования в БД одним INSERT ... ON CONFLICT DO UPDATE
+
+        Без db используется собственная сессия, чтобы ошибка сброса не откатывала транзакцию вызывающего.
+        """
+        with self._pending_lock:
+            pending = self._pending_usage
+            self._pending_usage = {}
+        if not pending:
+            return True
+        own_session = db is None
+        if own_session:
+            db = SessionLocal()
+        try:
+            if self._upsert_supported:
+                try:
+                    self._upsert_usage(db, pending)
+                except DBAPIError as exc:
+                    # Без уникального индекса (user_id, date) ON CONFLICT невозможен - переходим на построчный путь
+                    if getattr(exc.orig, 'pgcode', None) != _NO_CONFLICT_TARGET_PGCODE:
+                        raise
+                    db.rollback()
+                    self._upsert_supported = False
+                    logger.warning('Unique index on user_tts_usage (user_id, date) is missing; flushing usage row by row. Run migrate_add_indexes.py to restore it')
+                    self._update_usage_rows(db, pending)
+            else:
+                self._update_usage_rows(db, pending)
+            db.commit()
+            self._failed_flushes = 0
+            return True
+        except Exception:
+            logger.exception('Error flushing TTS usage')
             db.rollback()
+            self._retain_failed_flush(pending)
             return False
+        finally:
+            if own_session:
+                db.close()
+
+    @staticmethod
+    def _upsert_usage(db: Session, pending: dict[tuple[datetime, int], dict[str, Any]]) -> None:
+        stmt = pg_insert(UserTTSUsage).values([{'user_id': user_id, 'date': start_of_day, **delta} for ((start_of_day, user_id), delta) in pending.items()])
+        columns = UserTTSUsage.__table__.c
+        update_set = {field: func.coalesce(columns[field], 0) + stmt.excluded[field] for field in _USAGE_FIELDS}
+        update_set['updated_at'] = func.now()
+        db.execute(stmt.on_conflict_do_update(index_elements=['user_id', 'date'], set_=update_set))
+
+    @staticmethod
+    def _update_usage_rows(db: Session, pending: dict[tuple[datetime, int], dict[str, Any]]) -> None:
+        """Построчный сброс: UPDATE одной строки за день, INSERT если её ещё нет (дубликаты за день не трогаются)"""
+        table = UserTTSUsage.__table__
+        for ((start_of_day, user_id), delta) in pending.items():
+            target = select(func.min(table.c.id)).where(and_(table.c.user_id == user_id, table.c.date == start_of_day)).scalar_subquery()
+            values = {field: func.coalesce(table.c[field], 0) + value for (field, value) in delta.items()}
+            values['updated_at'] = func.now()
+            result = db.execute(table.update().where(table.c.id == target).values(values))
+            if result.rowcount == 0:
+                db.execute(table.insert().values(user_id=user_id, date=start_of_day, **delta))
+
+    def _retain_failed_flush(self, pending: dict[tuple[datetime, int], dict[str, Any]]) -> None:
+        """Вернуть несброшенные инкременты в очередь; после USAGE_FLUSH_MAX_FAILURES неудач подряд - отбросить"""
+        self._failed_flushes += 1
+        if self._failed_flushes >= USAGE_FLUSH_MAX_FAILURES:
+            dropped = sum((delta['requests_count'] for delta in pending.values()))
+            logger.error(f'Dropping TTS usage for {len(pending)} user-days ({dropped} requests) after {self._failed_flushes} failed flushes')
+            self._failed_flushes = 0
+            return
+        with self._pending_lock:
+            for (key, delta) in pending.items():
+                current = self._pending_usage.setdefault(key, dict.fromkeys(_USAGE_FIELDS, 0))
+                for (field, value) in delta.items():
+                    current[field] += value
+
+    def _flush_usage_at_exit(self) -> None:
+        if self._pending_usage:
+            self.flush_usage()
 
-    def get_user_stats(self, user_id: int, days: int=7, db: Session=None) -> Dict[str, Any]:
+    def get_user_stats(self, user_id: int, days: int=7, db: Session=None) -> dict[str, Any]:
         """Получить статистику пользователя за период"""
         try:
-            end_date = datetime.now().date()
-            start_date = end_date - timedelta(days=days)
-            stats = db.query(func.sum(UserTTSUsage.requests_count).label('total_requests'), func.sum(UserTTSUsage.gpu_time_seconds).label('total_gpu_time'), func.sum(UserTTSUsage.cpu_time_seconds).label('total_cpu_time'), func.sum(UserTTSUsage.total_characters).label('total_characters'), func.sum(UserTTSUsage.successful_requests).label('successful_requests'), func.sum(UserTTSUsage.failed_requests).label('failed_requests'), func.sum(UserTTSUsage.gpu_requests).label('gpu_requests'), func.sum(UserTTSUsage.cpu_requests).label('cpu_requests')).filter(and_(UserTTSUsage.user_id == user_id, UserTTSUsage.date >= start_date, UserTTSUsage.date <= end_date)).first()
+            self.flush_usage()
+            (start_date, end_date) = _period_bounds(days)
+            stats = db.execute(_USER_STATS_STMT, {'user_id': user_id, 'start_date': start_date, 'end_date': end_date}).first()
             if not stats or not stats.total_requests:
-                return {'period_days': days, 'total_requests': 0, 'total_gpu_time': 0.0, 'total_cpu_time': 0.0, 'total_characters': 0, 'successful_requests': 0, 'failed_requests': 0, 'gpu_requests': 0, 'cpu_requests': 0, 'success_rate': 0.0, 'avg_processing_time': 0.0}
+                return {'period_days': days, **_EMPTY_USER_STATS}
             success_rate = stats.successful_requests / stats.total_requests * 100 if stats.total_requests > 0 else 0
             avg_processing_time = (stats.total_gpu_time + stats.total_cpu_time) / stats.total_requests if stats.total_requests > 0 else 0
             return {'period_days': days, 'total_requests': stats.total_requests or 0, 'total_gpu_time': stats.total_gpu_time or 0.0, 'total_cpu_time': stats.total_cpu_time or 0.0, 'total_characters': stats.total_characters or 0, 'successful_requests': stats.successful_requests or 0, 'failed_requests': stats.failed_requests or 0, 'gpu_requests': stats.gpu_requests or 0, 'cpu_requests': stats.cpu_requests or 0, 'success_rate': round(success_rate, 2), 'avg_processing_time': round(avg_processing_time, 2)}
@@ -142,14 +348,14 @@ class TTSLimitsService:
             logger.exception('Error getting user stats for user {user_id}')
             return {}
 
-    def get_global_stats(self, days: int=7, db: Session=None) -> Dict[str, Any]:
+    def get_global_stats(self, days: int=7, db: Session=None) -> dict[str, Any]:
         """Получить глобальную статистику за период"""
         try:
-            end_date = datetime.now().date()
-            start_date = end_date - timedelta(days=days)
-            stats = db.query(func.count(func.distinct(UserTTSUsage.user_id)).label('unique_users'), func.sum(UserTTSUsage.requests_count).label('total_requests'), func.sum(UserTTSUsage.gpu_time_seconds).label('total_gpu_time'), func.sum(UserTTSUsage.cpu_time_seconds).label('total_cpu_time'), func.sum(UserTTSUsage.total_characters).label('total_characters'), func.sum(UserTTSUsage.successful_requests).label('successful_requests'), func.sum(UserTTSUsage.failed_requests).label('failed_requests')).filter(and_(UserTTSUsage.date >= start_date, UserTTSUsage.date <= end_date)).first()
+            self.flush_usage()
+            (start_date, end_date) = _period_bounds(days)
+            stats = db.execute(_GLOBAL_STATS_STMT, {'start_date': start_date, 'end_date': end_date}).first()
             if not stats or not stats.total_requests:
-                return {'period_days': days, 'unique_users': 0, 'total_requests': 0, 'total_gpu_time': 0.0, 'total_cpu_time': 0.0, 'total_characters': 0, 'successful_requests': 0, 'failed_requests': 0, 'success_rate': 0.0, 'avg_requests_per_user': 0.0}
+                return {'period_days': days, **_EMPTY_GLOBAL_STATS}
             success_rate = stats.successful_requests / stats.total_requests * 100 if stats.total_requests > 0 else 0
             avg_requests_per_user = stats.total_requests / stats.unique_users if stats.unique_users > 0 else 0
             return {'period_days': days, 'unique_users': stats.unique_users or 0, 'total_requests': stats.total_requests or 0, 'total_gpu_time': stats.total_gpu_time or 0.0, 'total_cpu_time': stats.total_cpu_time or 0.0, 'total_characters': stats.total_characters or 0, 'successful_requests': stats.successful_requests or 0, 'failed_requests': stats.failed_requests or 0, 'success_rate': round(success_rate, 2), 'avg_requests_per_user': round(avg_requests_per_user, 2)}
@@ -0,0 +1,61 @@
+"""Helpers shared by the admin and user voice upload endpoints."""
+
+import os
+import secrets
+import shutil
+import tempfile
+from pathlib import Path
+
+UPLOAD_COPY_CHUNK = 1 << 20
+
+# First four header bytes -> allowed form types at offset 8 (None: the magic alone is enough)
+_AUDIO_MAGIC = {
+    b"RIFF": frozenset({b"WAVE"}),  # WAV
+    b"FORM": frozenset({b"AIFF", b"AIFC"}),  # AIFF
+    b"OggS": None,  # OGG
+    b"fLaC": None,  # FLAC
+    b".snd": None,  # AU
+}
+_ASF_GUID_PREFIX = bytes.fromhex("3026B2758E66CF11")  # WMA/ASF
+
+
+def spool_upload(src, suffix: str) -> str:
+    """Copy an upload into a temp file in fixed-size chunks; runs in the executor."""
+    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as temp_file:
+        try:
+            shutil.copyfileobj(src, temp_file, UPLOAD_COPY_CHUNK)
+        except BaseException:
+            temp_file.close()
+            os.unlink(temp_file.name)
+            raise
+        return temp_file.name
+
+
+def staging_path(final_path: Path) -> Path:
+    """Unique hidden sibling of final_path; convert there and os.replace() into place after the DB commit."""
+    return final_path.with_name(f".{final_path.stem}.{secrets.token_hex(8)}{final_path.suffix}")
+
+
+def has_valid_audio_signature(file_path: str) -> bool:
+    """Best-effort magic header validation for common audio containers/codecs."""
+    try:
+        with open(file_path, "rb") as audio_file:
+            header = audio_file.read(16)
+    except OSError:
+        return False
+
+    if len(header) < 4:
+        return False
+
+    magic = header[:4]
+    if magic in _AUDIO_MAGIC:
+        form_types = _AUDIO_MAGIC[magic]
+        if form_types is None or header[8:12] in form_types:
+            return True
+    # MP3 (ID3 tag) or MPEG frame sync
+    if magic[:3] == b"ID3" or (header[0] == 0xFF and (header[1] & 0xE0) == 0xE0):
+        return True
+    # MP4/M4A family
+    if header[4:8] == b"ftyp" and len(header) >= 12:
+        return True
+    return header[:8] == _ASF_GUID_PREFIX